@@ -0,0 +1,36 @@
+import sys
+import time
+from typing import Callable
+
+from google.oauth2.credentials import Credentials  # type: ignore
+from googleapiclient.discovery import build  # type: ignore
+
+from pycal.api.providers.google_calendar import GoogleCalendarAPI
+
+
+def timed(run: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def main(calendars: int = 3) -> None:
+    credentials = Credentials(token="benchmark")
+
+    # The shared resource is timed first so it gets no help from anything
+    # `build` has already loaded.
+    shared = [
+        timed(lambda: GoogleCalendarAPI(f"{i}.json").service) for i in range(calendars)
+    ]
+    each = [
+        timed(lambda: build("calendar", "v3", credentials=credentials).events())
+        for _ in range(calendars)
+    ]
+
+    print(f"{calendars} calendars")
+    print(f"build per calendar: {sum(each) * 1000:8.2f} ms")
+    print(f"shared resource:    {sum(shared) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
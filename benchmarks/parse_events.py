@@ -0,0 +1,91 @@
+import sys
+import timeit
+from typing import Dict, List
+
+import arrow
+from mock import Mock
+
+from pycal.api import Event
+from pycal.api.providers.google_calendar import GoogleCalendar, GoogleEventStatus
+
+
+def make_events(count: int) -> List[Dict]:
+    start = arrow.get("2022-04-06T08:00:00+02:00")
+    events = []
+
+    for i in range(count):
+        begin = start.shift(minutes=30 * i)
+        events.append(
+            {
+                "id": f"event{i}",
+                "summary": f"Event {i}",
+                "start": {"dateTime": begin.isoformat(), "timeZone": "Europe/Madrid"},
+                "end": {
+                    "dateTime": begin.shift(minutes=25).isoformat(),
+                    "timeZone": "Europe/Madrid",
+                },
+                "location": "Some office room",
+                "hangoutLink": "http://meet.google.com/meeting",
+                "conferenceData": {"conferenceSolution": {"name": "Google Meet"}},
+                "attendees": [
+                    {"email": f"guest{j}@example.com", "responseStatus": "accepted"}
+                    for j in range(5)
+                ]
+                + [{"self": True, "responseStatus": "accepted"}],
+            }
+        )
+
+    return events
+
+
+def arrow_parse_event(event: Dict, calendar: str) -> Event:
+    going = GoogleEventStatus.needsAction.value
+
+    for attendee in event.get("attendees", []):
+        if attendee.get("self"):
+            going = GoogleEventStatus[
+                attendee.get("responseStatus", "needsAction")
+            ].value
+            break
+
+    return Event(
+        id=event["id"],
+        title=event["summary"],
+        start_time=arrow.get(event["start"]["dateTime"]),
+        end_time=arrow.get(event["end"]["dateTime"]),
+        location=event.get("location", "-"),
+        going=going,
+        type=event.get("conferenceData", {})
+        .get("conferenceSolution", {})
+        .get("name", "-"),
+        video_link=event.get("hangoutLink"),
+        calendar=calendar,
+    )
+
+
+def main(count: int = 5000, repeat: int = 5) -> None:
+    events = make_events(count)
+    calendar = GoogleCalendar("Benchmark", cache_manager=Mock(), service=Mock())
+
+    assert calendar._parse_events(events) == [
+        arrow_parse_event(event, "Benchmark") for event in events
+    ]
+
+    baseline = min(
+        timeit.repeat(
+            lambda: [arrow_parse_event(event, "Benchmark") for event in events],
+            number=1,
+            repeat=repeat,
+        )
+    )
+    batch = min(
+        timeit.repeat(lambda: calendar._parse_events(events), number=1, repeat=repeat)
+    )
+
+    print(f"{count} events, best of {repeat}")
+    print(f"arrow parser: {baseline * 1000:8.2f} ms")
+    print(f"batch parser: {batch * 1000:8.2f} ms ({baseline / batch:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,212 @@
+import argparse
+import fnmatch
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from arrow import Arrow
+from rich.console import Console
+
+from pycal.api import EventStorage
+from pycal.views.agenda import Agenda
+
+from benchmarks.synthetic import SyntheticCalendar
+
+
+def each(items: Iterable[Any], action: Callable[[Any], None]) -> None:
+    for item in items:
+        action(item)
+
+
+class Suite:
+    def __init__(self, repeat: int, only: Optional[List[str]]):
+        self.repeat = repeat
+        self.only = only
+        self.results: Dict[str, float] = {}
+
+    def bench(
+        self,
+        name: str,
+        run: Callable[[Any], Any],
+        setup: Callable[[], Any] = lambda: None,
+    ) -> None:
+        if self.only and not any(fnmatch.fnmatch(name, p) for p in self.only):
+            return
+
+        best = float("inf")
+
+        for _ in range(self.repeat):
+            state = setup()
+            start = time.perf_counter()
+            run(state)
+            best = min(best, time.perf_counter() - start)
+
+        self.results[name] = best
+        print(f"{name:<32} {best * 1000:12.3f} ms", file=sys.stderr)
+
+
+def run_size(suite: Suite, size: int, args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory(prefix="pycal-bench-") as cache_dir:
+        run_calendars(suite, size, args, cache_dir)
+
+
+def run_calendars(
+    suite: Suite, size: int, args: argparse.Namespace, cache_dir: str
+) -> None:
+    settings = {
+        "events": size // args.calendars,
+        "overlap": args.overlap,
+        "recurrence": args.recurrence,
+        "payload_size": args.payload_size,
+        "cache_dir": cache_dir,
+    }
+    calendars = [
+        SyntheticCalendar.from_settings(f"calendar{i}", settings)
+        for i in range(args.calendars)
+    ]
+    # Stands in for Config; EventStorage only reads these two attributes.
+    config: Any = SimpleNamespace(calendars=calendars, browser="true")
+    payloads = {c.name: c.service.payloads for c in calendars}
+    event_caches = {c: c.event_cache for c in calendars if c.event_cache}
+    parsed = {c.name: c._parse_events(payloads[c.name]) for c in calendars}
+    starts = sorted(e.start for events in parsed.values() for e in events)
+    middle = Arrow.fromtimestamp(starts[len(starts) // 2])
+
+    key = SyntheticCalendar.CACHE_FORMAT
+
+    for calendar in calendars:
+        calendar._build_cache(payloads[calendar.name], parsed[calendar.name], key=key)
+
+    def parse_each(_):
+        for calendar in calendars:
+            for payload in payloads[calendar.name]:
+                calendar._parse_event(payload)
+
+    def load_events_cache(_):
+        for calendar in event_caches:
+            list(event_caches[calendar].load(calendar.ttl, key) or ())
+
+    def empty_agenda():
+        agenda = Agenda(SimpleNamespace(list_events=lambda ignore_cache=False: []))
+        agenda.virtualized = True
+        agenda.storage = EventStorage(config)
+        return agenda
+
+    def loaded_agenda():
+        agenda = Agenda(EventStorage(config), virtualized=True)
+        return agenda, Console(file=io.StringIO(), width=120, height=50)
+
+    def render(state):
+        agenda, console = state
+        console.render_lines(agenda.render(), console.options)
+
+    suite.bench(f"parse_event/{size}", parse_each)
+    suite.bench(
+        f"parse_events/{size}",
+        lambda _: [c._parse_events(payloads[c.name]) for c in calendars],
+    )
+    suite.bench(
+        f"merge_events/{size}",
+        lambda storage: list(storage._merge_events(parsed.values())),
+        lambda: EventStorage(config),
+    )
+    suite.bench(
+        f"cache.json.build/{size}",
+        lambda _: each(
+            calendars,
+            lambda c: c.cache_manager.build_cache(payloads[c.name], key=key),
+        ),
+    )
+    suite.bench(
+        f"cache.json.load/{size}",
+        lambda _: [c.cache_manager.load_cache(c.ttl) for c in calendars],
+    )
+    suite.bench(
+        f"cache.events.build/{size}",
+        lambda _: each(
+            event_caches, lambda c: event_caches[c].build(parsed[c.name], key=key)
+        ),
+    )
+    suite.bench(f"cache.events.load/{size}", load_events_cache)
+    suite.bench(
+        f"get_closest_event/{size}",
+        lambda storage: storage.get_closest_event(when=middle),
+        lambda: EventStorage(config),
+    )
+    suite.bench(
+        f"agenda.load_events/{size}",
+        lambda agenda: agenda.load_events(),
+        empty_agenda,
+    )
+    suite.bench(f"agenda.render/{size}", render, loaded_agenda)
+
+
+def compare(results: Dict[str, float], baseline_file: str, threshold: float) -> bool:
+    with open(baseline_file) as f:
+        baseline = json.load(f)["results"]
+
+    regressed = False
+
+    for name, seconds in results.items():
+        if name not in baseline:
+            continue
+
+        ratio = seconds / baseline[name]
+        flag = ""
+
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+
+        print(f"{name:<32} {ratio:8.2f}x{flag}", file=sys.stderr)
+
+    return not regressed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time pycal on synthetic calendars.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--calendars", type=int, default=3)
+    parser.add_argument("--overlap", type=float, default=0.1)
+    parser.add_argument("--recurrence", type=float, default=0.3)
+    parser.add_argument("--payload-size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", help="glob patterns of benchmarks")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    suite = Suite(args.repeat, args.only)
+
+    for size in args.sizes:
+        run_size(suite, size, args)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            k: v for k, v in vars(args).items() if k not in ("output", "baseline")
+        },
+        "results": suite.results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+    if args.baseline and not compare(suite.results, args.baseline, args.threshold):
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Generator, Iterator, List, Optional
+
+from pycal.api import EventCache, JsonCacheManager
+from pycal.api.providers.google_calendar import (
+    RESPONSES,
+    GoogleCalendar,
+    GoogleCalendarAPI,
+)
+
+
+RESPONSE_STATUSES = list(RESPONSES)
+
+
+def google_time(timestamp: int) -> Dict[str, str]:
+    return {
+        "dateTime": datetime.fromtimestamp(timestamp, timezone.utc).isoformat(),
+        "timeZone": "Europe/Madrid",
+    }
+
+
+def make_payloads(
+    count: int,
+    calendar: str,
+    overlap: float = 0.1,
+    recurrence: float = 0.3,
+    payload_size: int = 200,
+    start: Optional[int] = None,
+    seed: int = 0,
+) -> List[Dict]:
+    # Series are only expanded from now on, so by default the calendar
+    # starts today rather than at a fixed date.
+    if start is None:
+        start = int(time.time()) // 86400 * 86400
+
+    rng = random.Random(f"{calendar}:{seed}")
+    series = [(f"Recurring {i}", rng.randrange(8, 18) * 3600) for i in range(20)]
+    description = "x" * payload_size
+    slots = []
+    day, cursor = 0, 8 * 3600
+
+    for i in range(count):
+        duration = rng.choice((900, 1800, 3600))
+
+        # Series masters land on their own slot of the day; one-offs fill
+        # the day after the previous event, optionally overlapping it.
+        if rng.random() < recurrence:
+            title, slot = rng.choice(series)
+            begin = start + day * 86400 + slot
+            rule = f"RRULE:FREQ=WEEKLY;COUNT={rng.choice((2, 4, 8))}"
+        else:
+            title = f"Event {i}"
+            gap = -duration // 2 if rng.random() < overlap else rng.choice((0, 900))
+            cursor = max(cursor + gap, 0)
+            begin = start + day * 86400 + cursor
+            cursor += duration
+            rule = None
+
+        if cursor > 19 * 3600:
+            day, cursor = day + 1, 8 * 3600
+
+        slots.append((begin, i, title, duration, rule))
+
+    slots.sort()
+    payloads: List[Dict[str, Any]] = []
+
+    for begin, i, title, duration, rule in slots:
+        payload: Dict[str, Any] = {
+            "id": f"{calendar}-{i}",
+            "summary": title,
+            "start": google_time(begin),
+            "end": google_time(begin + duration),
+            "location": f"Room {i % 40}",
+            "description": description,
+            "attendees": [
+                {"email": f"guest{j}@example.com", "responseStatus": "accepted"}
+                for j in range(3)
+            ]
+            + [{"self": True, "responseStatus": rng.choice(RESPONSE_STATUSES)}],
+        }
+
+        if i % 2:
+            payload["hangoutLink"] = f"https://meet.example.com/{i}"
+            payload["conferenceData"] = {"conferenceSolution": {"name": "Google Meet"}}
+
+        if rule:
+            payload["recurrence"] = [rule]
+
+        payloads.append(payload)
+
+    return payloads
+
+
+class SyntheticAPI(GoogleCalendarAPI):
+    # Serves the payloads from memory as a single page.
+    def __init__(self, payloads: List[Dict]):
+        self.payloads = payloads
+
+    def get_events(self, *args: Any, **kwargs: Any) -> Iterator[Any]:
+        return iter(self.payloads)
+
+    def sync_events(self, *args: Any, **kwargs: Any) -> Generator[Any, None, str]:
+        yield from self.payloads
+        return "synthetic"
+
+
+class SyntheticCalendar(GoogleCalendar):
+    service: SyntheticAPI
+
+    @classmethod
+    def from_settings(cls, name: str, config: Dict) -> "SyntheticCalendar":
+        payloads = make_payloads(
+            config["events"],
+            name,
+            overlap=config.get("overlap", 0.1),
+            recurrence=config.get("recurrence", 0.3),
+            payload_size=config.get("payload_size", 200),
+        )
+        cache_dir = config["cache_dir"]
+
+        return cls(
+            name,
+            cache_manager=JsonCacheManager(f"{cache_dir}/{name}.json"),
+            service=SyntheticAPI(payloads),
+            ttl=86400,
+            event_cache=EventCache(f"{cache_dir}/{name}.events"),
+        )
@@ -1,26 +1,50 @@
-from datetime import timedelta
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone, tzinfo
 import heapq
+from itertools import accumulate, chain, count, dropwhile, islice, takewhile
 import os
 import json
+import mmap
+import struct
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from contextlib import contextmanager
+from functools import lru_cache
+import hashlib
 from enum import Enum
+import sqlite3
 import subprocess
+import sys
+import threading
 from typing import (
     Any,
+    Callable,
+    ClassVar,
     Generic,
     Iterable,
+    Iterator,
     Optional,
     List,
     Dict,
     Protocol,
+    Sequence,
     Tuple,
     TypeVar,
+    Union,
 )
 
 from arrow import Arrow
+from arrow.parser import TzinfoParser
+from dateutil import tz as dateutil_tz
+from dateutil.rrule import rrulestr
 
 from pycal.config import Config
+from pycal.tracing import span
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
 
 
 class EventStatus(str, Enum):
@@ -29,89 +53,1028 @@ class EventStatus(str, Enum):
     NOT_ANSWERED = "not answered"
 
 
-@dataclass
+Moment = Union[Arrow, datetime]
+
+
+@lru_cache(maxsize=None)
+def get_tzinfo(tz: str) -> tzinfo:
+    return TzinfoParser.parse(tz)
+
+
+def get_tz_id(value: Moment) -> str:
+    zone = value.tzinfo
+
+    # Naive datetimes are converted to timestamps as local time.
+    if zone is None or isinstance(zone, dateutil_tz.tzlocal):
+        return "local"
+
+    if isinstance(zone, dateutil_tz.tzutc) or zone == timezone.utc:
+        return "UTC"
+
+    if name := getattr(zone, "key", None) or getattr(zone, "_filename", None):
+        return sys.intern(name.rpartition("zoneinfo/")[2])
+
+    offset = int(value.utcoffset().total_seconds())  # type: ignore[union-attr]
+    sign = "-" if offset < 0 else "+"
+    return sys.intern(f"{sign}{abs(offset) // 3600:02}:{abs(offset) % 3600 // 60:02}")
+
+
 class Event:
-    id: str
-    title: str
-    start_time: Arrow
-    end_time: Arrow
-    location: str
-    going: EventStatus
-    type: str
-    video_link: Optional[str]
-    calendar: str
+    # Events are kept for every loaded calendar, so they store epoch seconds
+    # and an interned timezone id and only build Arrow objects on access.
+    __slots__ = (
+        "id",
+        "title",
+        "start",
+        "end",
+        "tz",
+        "location",
+        "going",
+        "type",
+        "video_link",
+        "calendar",
+    )
+    _fields: ClassVar[Tuple[str, ...]] = __slots__
+
+    def __init__(
+        self,
+        id: str,
+        title: str,
+        start_time: Moment,
+        end_time: Moment,
+        location: str,
+        going: EventStatus,
+        type: str,
+        video_link: Optional[str],
+        calendar: str,
+    ):
+        self.id = id
+        self.title = title
+        self.start = int(start_time.timestamp())
+        self.end = int(end_time.timestamp())
+        self.tz = get_tz_id(start_time)
+        self.location = location
+        self.going = going
+        self.type = type
+        self.video_link = video_link
+        self.calendar = calendar
+
+    @classmethod
+    def from_epochs(
+        cls,
+        id: str,
+        title: str,
+        start: int,
+        end: int,
+        tz: str,
+        location: str,
+        going: EventStatus,
+        type: str,
+        video_link: Optional[str],
+        calendar: str,
+    ) -> "Event":
+        event = cls.__new__(cls)
+        event.id = id
+        event.title = title
+        event.start = start
+        event.end = end
+        event.tz = sys.intern(tz)
+        event.location = location
+        event.going = going
+        event.type = type
+        event.video_link = video_link
+        event.calendar = calendar
+        return event
+
+    @property
+    def start_time(self) -> Arrow:
+        return Arrow.fromtimestamp(self.start, tzinfo=get_tzinfo(self.tz))
+
+    @property
+    def end_time(self) -> Arrow:
+        return Arrow.fromtimestamp(self.end, tzinfo=get_tzinfo(self.tz))
+
+    def _astuple(self) -> Tuple:
+        return tuple(getattr(self, field) for field in self._fields)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Event):
+            return NotImplemented
+
+        return self._astuple() == other._astuple()
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{f}={getattr(self, f)!r}" for f in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+
+def recurrence_stamp(timestamp: int, tz: str) -> str:
+    # Floating and all-day series repeat on local wall-clock time, so their
+    # instances are identified by local time instead of UTC.
+    if tz == "local":
+        return f"{datetime.fromtimestamp(timestamp):%Y%m%dT%H%M%S}"
+
+    return f"{datetime.fromtimestamp(timestamp, timezone.utc):%Y%m%dT%H%M%SZ}"
+
+
+class RecurringEvent(Event):
+    # The first occurrence of a series and the RFC 5545 RRULE, RDATE and
+    # EXDATE lines that generate the rest. Instances are only built for the
+    # window being read.
+    __slots__ = ("rule",)
+    _fields = Event.__slots__ + ("rule",)
+
+    rule: str
+
+    @classmethod
+    def from_event(cls, event: Event, rule: str) -> "RecurringEvent":
+        master = cls.__new__(cls)
+
+        for field in Event.__slots__:
+            setattr(master, field, getattr(event, field))
+
+        master.rule = rule
+        return master
+
+    def occurrences(self, time_min: float, time_max: float) -> Iterator[Event]:
+        start = self.start_time.datetime
+        duration = self.end - self.start
+
+        if self.tz == "local":
+            start = start.replace(tzinfo=None)
+
+        moments: Iterable[datetime]
+
+        try:
+            rules = rrulestr(self.rule, dtstart=start, forceset=True, unfold=True)
+            moments = rules.xafter(
+                datetime.fromtimestamp(time_min - duration, start.tzinfo)
+            )
+        except ValueError:
+            # Unreadable rules leave only the first occurrence on the agenda.
+            moments = [start] if self.end > time_min else []
+
+        for moment in moments:
+            begin = int(moment.timestamp())
+
+            if begin >= time_max:
+                return
+
+            yield Event.from_epochs(
+                id=f"{self.id}_{recurrence_stamp(begin, self.tz)}",
+                title=self.title,
+                start=begin,
+                end=begin + duration,
+                tz=self.tz,
+                location=self.location,
+                going=self.going,
+                type=self.type,
+                video_link=self.video_link,
+                calendar=self.calendar,
+            )
+
+
+def expand_recurrences(
+    events: Iterable[Event], time_min: float, time_max: float
+) -> Iterator[Event]:
+    iterator = iter(events)
+
+    # Calendars without series are passed through untouched.
+    for event in iterator:
+        if isinstance(event, RecurringEvent):
+            yield from _merge_occurrences(chain((event,), iterator), time_min, time_max)
+            return
+
+        yield event
+
+
+def _merge_occurrences(
+    events: Iterator[Event], time_min: float, time_max: float
+) -> Iterator[Event]:
+    heap: List[Tuple[int, int, Event, Iterator[Event]]] = []
+    counter = count()
+
+    def push(iterator: Iterator[Event]) -> None:
+        if (event := next(iterator, None)) is not None:
+            heapq.heappush(heap, (event.start, next(counter), event, iterator))
+
+    # No instance starts before its series, so a series met in the start
+    # ordered stream is expanded from that point on without reordering
+    # anything already yielded.
+    push(events)
+
+    while heap:
+        _, _, event, iterator = heapq.heappop(heap)
+        push(iterator)
+
+        if isinstance(event, RecurringEvent):
+            push(event.occurrences(time_min, time_max))
+        else:
+            yield event
+
+
+@contextmanager
+def file_lock(lock_file: Optional[str], timeout: float = 30) -> Iterator[bool]:
+    # Yields whether another process held the lock first. Past the timeout,
+    # or where advisory locks are unavailable, the caller runs unlocked.
+    try:
+        f = open(lock_file, "a") if lock_file else None
+    except OSError:
+        f = None
+
+    if f is None:
+        yield False
+        return
+
+    contended = False
+    deadline = time.monotonic() + timeout
+
+    with f:
+        while fcntl is not None:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                contended = True
+
+                if time.monotonic() >= deadline:
+                    break
+
+                time.sleep(0.05)
+
+        # Closing the file releases the lock.
+        yield contended
 
 
 T = TypeVar("T")
+T_co = TypeVar("T_co", covariant=True)
 
 
-class CalendarAPI(Protocol[T]):
-    def get_events(self) -> List[T]:
+class CalendarAPI(Protocol[T_co]):
+    def get_events(self) -> Iterable[T_co]:
         ...
 
 
 class CacheManager(Protocol[T]):
-    def load_cache(self, expiration: int = 600) -> Tuple[List[T], bool]:
+    metadata: Dict[str, Any]
+
+    def load_cache(
+        self, expiration: int = 600, since: Optional[float] = None
+    ) -> Tuple[List[T], bool]:
         ...
 
-    def build_cache(self, events: List[T]) -> None:
+    def build_cache(self, events: List[T], **metadata: Any) -> None:
         ...
 
 
 class JsonCacheManager:
     def __init__(self, cache_file: str):
         self.cache_file = cache_file
+        self.metadata: Dict[str, Any] = {}
 
-    def load_cache(self, expiration: int = 600) -> Tuple[List[Dict[Any, Any]], bool]:
+    def load_cache(
+        self, expiration: int = 600, since: Optional[float] = None
+    ) -> Tuple[List[Dict[Any, Any]], bool]:
+        # The file is read whole, so `since` only matters to other caches.
         if not os.path.exists(self.cache_file):
+            self.metadata = {}
             return [], False
 
         with open(self.cache_file, "r") as f:
             cache = json.load(f)
+            self.metadata = {k: v for k, v in cache.items() if k != "events"}
             delta: timedelta = Arrow.now() - Arrow.fromtimestamp(cache["load_time"])
             valid = delta.total_seconds() <= expiration
             return cache["events"], valid
 
-    def build_cache(self, events: List[Dict[Any, Any]]) -> None:
-        with open(self.cache_file, "w") as f:
+    def build_cache(self, events: List[Dict[Any, Any]], **metadata: Any) -> None:
+        # Other processes may be reading the cache, so it is written aside
+        # and renamed over the old one.
+        temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+
+        with open(temp_file, "w") as f:
             cache = {
                 "events": events,
                 "load_time": Arrow.now().timestamp(),
+                **metadata,
             }
 
             json.dump(cache, f)
 
+        os.replace(temp_file, self.cache_file)
+
+
+class SqliteCacheManager(Generic[T]):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS calendars (
+            name TEXT PRIMARY KEY,
+            load_time REAL NOT NULL,
+            metadata TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS events (
+            calendar TEXT NOT NULL,
+            id TEXT NOT NULL,
+            start_time REAL NOT NULL,
+            end_time REAL NOT NULL,
+            is_series INTEGER NOT NULL,
+            payload TEXT NOT NULL,
+            PRIMARY KEY (calendar, id)
+        );
+
+        CREATE INDEX IF NOT EXISTS events_by_start ON events (calendar, start_time);
+    """
+    SCHEMA_VERSION = 2
+
+    def __init__(
+        self,
+        cache_file: str,
+        calendar: str,
+        event_key: Callable[[T], Tuple[str, float, float, bool]],
+    ):
+        self.cache_file = cache_file
+        self.calendar = calendar
+        self.event_key = event_key
+        self.metadata: Dict[str, Any] = {}
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.cache_file)
+
+        try:
+            if not self._initialized:
+                connection.execute("PRAGMA journal_mode=WAL")
+                (version,) = connection.execute("PRAGMA user_version").fetchone()
+
+                # Caches written with another schema are dropped and refetched.
+                if version != self.SCHEMA_VERSION:
+                    connection.executescript(
+                        "DROP TABLE IF EXISTS events; DROP TABLE IF EXISTS calendars;"
+                    )
+                    connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+                connection.executescript(self.SCHEMA)
+                self._initialized = True
+
+            yield connection
+        finally:
+            connection.close()
+
+    def load_cache(
+        self, expiration: int = 600, since: Optional[float] = None
+    ) -> Tuple[List[T], bool]:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT load_time, metadata FROM calendars WHERE name = ?",
+                (self.calendar,),
+            ).fetchone()
+
+            if not row:
+                self.metadata = {}
+                return [], False
+
+            load_time, metadata = row
+            self.metadata = {"load_time": load_time, **json.loads(metadata)}
+
+            if since is None:
+                events = self._select(connection, "calendar = ?", self.calendar)
+            else:
+                events = self._select_range(connection, since, float("inf"))
+
+            valid = Arrow.now().timestamp() - load_time <= expiration
+            return events, valid
+
+    def load_range(self, start: float, end: float) -> List[T]:
+        with self._connect() as connection:
+            return self._select_range(connection, start, end)
+
+    def _select_range(
+        self, connection: sqlite3.Connection, start: float, end: float
+    ) -> List[T]:
+        # Series rows are read whatever their dates, since their instances
+        # and exceptions may fall anywhere in the range.
+        return self._select(
+            connection,
+            "calendar = ? AND start_time < ? AND (end_time > ? OR is_series)",
+            self.calendar,
+            end,
+            start,
+        )
+
+    @staticmethod
+    def _select(connection: sqlite3.Connection, where: str, *args: Any) -> List[T]:
+        events = connection.execute(
+            f"SELECT payload FROM events WHERE {where} ORDER BY start_time", args
+        )
+
+        return [json.loads(payload) for payload, in events]
+
+    def build_cache(self, events: List[T], **metadata: Any) -> None:
+        rows = []
+
+        for event in events:
+            event_id, start_time, end_time, is_series = self.event_key(event)
+            rows.append(
+                (
+                    self.calendar,
+                    event_id,
+                    start_time,
+                    end_time,
+                    is_series,
+                    json.dumps(event),
+                )
+            )
+
+        with self._connect() as connection, connection:
+            connection.executemany(
+                "INSERT INTO events "
+                "(calendar, id, start_time, end_time, is_series, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (calendar, id) DO UPDATE SET "
+                "start_time = excluded.start_time, "
+                "end_time = excluded.end_time, "
+                "is_series = excluded.is_series, "
+                "payload = excluded.payload",
+                rows,
+            )
+            connection.execute(
+                "DELETE FROM events WHERE calendar = ? "
+                "AND id NOT IN (SELECT value FROM json_each(?))",
+                (self.calendar, json.dumps([row[1] for row in rows])),
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO calendars (name, load_time, metadata) "
+                "VALUES (?, ?, ?)",
+                (self.calendar, Arrow.now().timestamp(), json.dumps(metadata)),
+            )
+
+
+class EventRecords(Sequence[Event]):
+    def __init__(self, buffer: mmap.mmap, count: int, string_count: int):
+        self._buffer = buffer
+        self._count = count
+        self._offsets = EventCache.HEADER.size + count * EventCache.RECORD.size
+        self._blob = self._offsets + (string_count + 1) * 4
+        self._strings: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+
+        if index < 0:
+            index += self._count
+
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+
+        position = EventCache.HEADER.size + index * EventCache.RECORD.size
+        start, end, going, *refs = EventCache.RECORD.unpack_from(self._buffer, position)
+        id, title, tz, location, type, video_link, calendar, rule = map(
+            self._string, refs
+        )
+
+        event = Event.from_epochs(
+            id=id,
+            title=title,
+            start=start,
+            end=end,
+            tz=tz,
+            location=location,
+            going=EventCache.STATUSES[going],
+            type=type,
+            video_link=video_link,
+            calendar=calendar,
+        )
+
+        if rule is not None:
+            return RecurringEvent.from_event(event, rule)
+
+        return event
+
+    def _string(self, ref: int) -> Optional[str]:
+        if ref == EventCache.NONE:
+            return None
+
+        if (value := self._strings.get(ref)) is None:
+            lo, hi = struct.unpack_from("<2I", self._buffer, self._offsets + ref * 4)
+            start, end = self._blob + lo, self._blob + hi
+            value = self._strings[ref] = self._buffer[start:end].decode()
+
+        return value
+
+    def start(self, index: int) -> int:
+        position = EventCache.HEADER.size + index * EventCache.RECORD.size
+        return struct.unpack_from("<q", self._buffer, position)[0]
+
+    def bisect(self, timestamp: float) -> int:
+        lo, hi = 0, self._count
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+
+            if self.start(mid) < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        return lo
+
+    def rule(self, index: int) -> int:
+        position = EventCache.HEADER.size + (index + 1) * EventCache.RECORD.size
+        return struct.unpack_from("<I", self._buffer, position - 4)[0]
+
+    def since(self, timestamp: float) -> Iterator[Event]:
+        lo = self.bisect(timestamp)
+
+        # Series starting earlier still have instances from `timestamp` on,
+        # so only their records are decoded before it.
+        for index in range(lo):
+            if self.rule(index) != EventCache.NONE:
+                yield self[index]
+
+        for index in range(lo, self._count):
+            yield self[index]
+
+
+class EventCache:
+    # Parsed events are stored as fixed-width records followed by a string
+    # table, so a cache hit only decodes the records it actually reads.
+    MAGIC = b"PYCE"
+    VERSION = 4
+    HEADER = struct.Struct("<4sHdII20sI")
+    RECORD = struct.Struct("<qqB8I")
+    STATUSES = list(EventStatus)
+    NONE = 0xFFFFFFFF
+
+    def __init__(self, cache_file: str):
+        self.cache_file = cache_file
+        self.load_time: Optional[float] = None
+
+    @staticmethod
+    def _digest(key: str) -> bytes:
+        return hashlib.sha1(key.encode()).digest()
+
+    def load(self, expiration: int = 600, key: str = "") -> Optional[EventRecords]:
+        try:
+            with open(self.cache_file, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        if len(buffer) < self.HEADER.size:
+            return None
+
+        (
+            magic,
+            version,
+            load_time,
+            count,
+            string_count,
+            digest,
+            ttl,
+        ) = self.HEADER.unpack_from(buffer)
+
+        if magic != self.MAGIC or version != self.VERSION:
+            return None
+
+        # The key describes the source the events were built from, so any
+        # change to it invalidates the cache regardless of its age.
+        if digest != self._digest(key):
+            return None
+
+        self.load_time = load_time
+
+        # Calendars with an adaptive ttl store the one they settled on.
+        if Arrow.now().timestamp() - load_time > (ttl or expiration):
+            return None
+
+        return EventRecords(buffer, count, string_count)
+
+    def build(
+        self,
+        events: Iterable[Event],
+        load_time: Optional[float] = None,
+        key: str = "",
+        ttl: int = 0,
+    ) -> None:
+        strings: Dict[str, int] = {}
+        records = bytearray()
+
+        def ref(value: Optional[str]) -> int:
+            if value is None:
+                return self.NONE
+
+            return strings.setdefault(value, len(strings))
+
+        for event in sorted(events, key=lambda event: event.start):
+            records += self.RECORD.pack(
+                event.start,
+                event.end,
+                self.STATUSES.index(event.going),
+                ref(event.id),
+                ref(event.title),
+                ref(event.tz),
+                ref(event.location),
+                ref(event.type),
+                ref(event.video_link),
+                ref(event.calendar),
+                ref(event.rule if isinstance(event, RecurringEvent) else None),
+            )
+
+        blob = [value.encode() for value in strings]
+        offsets = accumulate(map(len, blob), initial=0)
+        header = self.HEADER.pack(
+            self.MAGIC,
+            self.VERSION,
+            load_time or Arrow.now().timestamp(),
+            len(records) // self.RECORD.size,
+            len(blob),
+            self._digest(key),
+            ttl,
+        )
+
+        # Readers may have the previous file mapped, so it is replaced rather
+        # than rewritten in place.
+        temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+
+        with open(temp_file, "wb") as f:
+            f.write(header)
+            f.write(records)
+            f.write(struct.pack(f"<{len(blob) + 1}I", *offsets))
+            f.write(b"".join(blob))
+
+        os.replace(temp_file, self.cache_file)
+
 
 class BaseCalendar(ABC, Generic[T]):
-    def __init__(self, name: str, cache_manager: CacheManager, service: CalendarAPI):
+    # Command a calendar's name is appended to in order to revalidate it in a
+    # detached process; without one, revalidation runs on a thread.
+    revalidate_command: ClassVar[Optional[List[str]]] = None
+
+    def __init__(
+        self,
+        name: str,
+        cache_manager: CacheManager,
+        service: CalendarAPI,
+        ttl: int = 600,
+        max_stale: int = 0,
+        event_cache: Optional[EventCache] = None,
+        horizon: int = 365,
+        lock_file: Optional[str] = None,
+        ttl_bounds: Optional[Sequence[int]] = None,
+    ):
         self.name = name
         self.cache_manager = cache_manager
         self.service = service
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.event_cache = event_cache
+        self.horizon = horizon
+        self.lock_file = lock_file
+        self.ttl_bounds = ttl_bounds
+        self._revalidation: Optional[threading.Thread] = None
+        self._revalidator: Optional[subprocess.Popen] = None
 
-    def get_events(self, ignore_cache: bool = False) -> Iterable[Event]:
-        events: List[T] = []
-        valid: bool = False
+    def get_events(
+        self, ignore_cache: bool = False, since: Optional[float] = None
+    ) -> Iterable[Event]:
+        # Caches keep recurring events as a single series, which is expanded
+        # into instances up to `horizon` days ahead as the stream is read.
+        now = Arrow.now().timestamp()
+
+        return expand_recurrences(
+            self._load_events(ignore_cache, since), now, now + self.horizon * 86400
+        )
+
+    def _load_events(
+        self, ignore_cache: bool, since: Optional[float] = None
+    ) -> Iterator[Event]:
+        key = self._cache_key()
+
+        if not ignore_cache and self.event_cache:
+            with span("cache.events.load", calendar=self.name):
+                records = self.event_cache.load(self.ttl, key)
+
+            # Events starting before `since` may be left out, which the
+            # records can do without decoding them.
+            if records is not None:
+                yield from records if since is None else records.since(since)
+                return
+
+        since = None if ignore_cache else since
+
+        with span("cache.load", calendar=self.name):
+            events, valid = self._load_cache(key, since)
+
+        if not ignore_cache and valid:
+            parsed = self._parse_events(events)
+            metadata = self.cache_manager.metadata
+
+            # A range read only holds part of the calendar.
+            if self.event_cache and since is None:
+                self.event_cache.build(
+                    parsed, metadata.get("load_time"), key, metadata.get("ttl", 0)
+                )
+
+            yield from parsed
+            return
+
+        # Refreshes merge into and rewrite the whole cache.
+        if since is not None:
+            events, _ = self._load_cache(key)
+
+        if not ignore_cache and self._revalidate(events):
+            yield from self._parse_events(events)
+        else:
+            yield from self._refresh_once(events, key, ignore_cache)
+
+    def _refresh_once(
+        self, events: List[T], key: str, ignore_cache: bool
+    ) -> Iterator[Event]:
+        if not self.lock_file:
+            yield from self._refresh_events(events)
+            return
+
+        # Processes that find the cache expired at the same time queue on the
+        # lock; whoever waited reads what the first one fetched. The lock is
+        # released before anything is yielded, so a slow reader holds nobody up.
+        with file_lock(self.lock_file) as contended:
+            valid = False
+
+            if contended and not ignore_cache:
+                events, valid = self._load_cache(key)
+
+            if valid:
+                parsed = self._parse_events(events)
+            else:
+                parsed = list(self._refresh_events(events))
+
+        yield from parsed
+
+    @classmethod
+    def authorize(cls, calendars: List["BaseCalendar"]) -> None:
+        # Called on the main thread before calendars are fetched concurrently,
+        # for steps that wait for the user and must not count against the
+        # fetch timeout.
+        pass
+
+    @classmethod
+    def prefetch(cls, calendars: List["BaseCalendar"], ignore_cache: bool) -> None:
+        # Called with all calendars of a provider before any of them is read,
+        # so providers can fetch those that need a refresh together.
+        pass
+
+    def _needs_refresh(self, ignore_cache: bool) -> bool:
+        key = self._cache_key()
+
+        if not ignore_cache and self.event_cache:
+            if self.event_cache.load(self.ttl, key) is not None:
+                return False
 
-        if not ignore_cache:
-            events, valid = self.cache_manager.load_cache()
+        _, valid = self._load_cache(key)
 
-        if not valid:
-            events = self.service.get_events()
-            self.cache_manager.build_cache(events)
+        if ignore_cache:
+            return True
 
-        yield from (self._parse_event(event) for event in events)
+        if valid:
+            return False
+
+        load_time = self.cache_manager.metadata.get("load_time")
+        return not load_time or Arrow.now().timestamp() - load_time > self.max_stale
+
+    def _load_cache(
+        self, key: str, since: Optional[float] = None
+    ) -> Tuple[List[T], bool]:
+        events, valid = self.cache_manager.load_cache(self.ttl, since)
+        metadata = self.cache_manager.metadata
+
+        if ttl := metadata.get("ttl"):
+            valid = Arrow.now().timestamp() - metadata["load_time"] <= ttl
+
+        return events, valid and metadata.get("key", "") == key
+
+    def _cache_key(self) -> str:
+        return ""
+
+    def _adapt_ttl(self, events: List[T], changed: Optional[bool]) -> Dict[str, Any]:
+        if not self.ttl_bounds:
+            return {}
+
+        low, high = self.ttl_bounds
+        metadata = self.cache_manager.metadata
+        digest = hashlib.sha1(
+            json.dumps(events, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+        # Providers that know whether the source changed say so; otherwise
+        # the fetched events are compared with the previous fetch.
+        if changed is None:
+            changed = metadata.get("digest") != digest
+
+        # Each refresh that finds nothing changed doubles the ttl, and each
+        # one that finds changes halves it, so refreshes follow the changes.
+        ttl = metadata.get("ttl")
+
+        if ttl is None:
+            ttl = self.ttl
+        else:
+            ttl = ttl // 2 if changed else ttl * 2
+
+        # The event cache stores the ttl as an unsigned int.
+        return {"ttl": int(min(max(ttl, low), high)), "digest": digest}
+
+    def _revalidate(self, events: List[T]) -> bool:
+        load_time = self.cache_manager.metadata.get("load_time")
+
+        if not load_time or Arrow.now().timestamp() - load_time > self.max_stale:
+            return False
+
+        # Serve the stale copy now and rebuild the cache for the next call.
+        if self.revalidate_command is not None:
+            self._spawn_revalidation(self.revalidate_command)
+        elif not self._revalidation or not self._revalidation.is_alive():
+            # Not a daemon, even when started from a fetch thread that is,
+            # so the refresh is not cut short when the process exits.
+            self._revalidation = threading.Thread(
+                target=self._run_revalidation, args=(events,), daemon=False
+            )
+            self._revalidation.start()
+
+        return True
+
+    def _spawn_revalidation(self, command: List[str]) -> None:
+        if self._revalidator and self._revalidator.poll() is None:
+            return
+
+        # A new session holds neither the terminal nor the output of this
+        # process, so shells waiting on it return as soon as it exits.
+        self._revalidator = subprocess.Popen(
+            [*command, self.name],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+    def revalidate(self) -> None:
+        events, _ = self._load_cache(self._cache_key())
+        self._run_revalidation(events)
+
+    def _run_revalidation(self, events: List[T]) -> None:
+        try:
+            # A refresh already running elsewhere makes this one redundant.
+            with file_lock(self.lock_file, timeout=0) as contended:
+                if not contended:
+                    for _ in self._refresh_events(events):
+                        pass
+        except Exception:
+            # A failed refresh leaves the stale copy in place for the next call.
+            pass
+
+    def _refresh_events(self, cached: List[T]) -> Iterable[Event]:
+        events = []
+        parsed = []
+
+        for event in self.service.get_events():
+            events.append(event)
+            parsed.append(self._parse_event(event))
+            yield parsed[-1]
+
+        self._build_cache(events, parsed)
+
+    def _build_cache(
+        self,
+        events: List[T],
+        parsed: List[Event],
+        changed: Optional[bool] = None,
+        **metadata,
+    ) -> None:
+        metadata.update(self._adapt_ttl(events, changed))
+
+        with span("cache.build", calendar=self.name):
+            self.cache_manager.build_cache(events, **metadata)
+
+        if self.event_cache:
+            with span("cache.events.build", calendar=self.name):
+                self.event_cache.build(
+                    parsed, key=metadata.get("key", ""), ttl=metadata.get("ttl", 0)
+                )
 
     @abstractmethod
     def _parse_event(self, event: T):
         """ """
         raise NotImplementedError
 
+    def _parse_events(self, events: Iterable[T]) -> List[Event]:
+        with span("parse", calendar=self.name):
+            return [self._parse_event(event) for event in events]
+
+
+class EventIndex:
+    def __init__(self, events: Iterable[Event]):
+        self.events: List[Event] = list(events)
+        self._starts = [event.start for event in self.events]
+        self._ends = [event.end for event in self.events]
+        self._max_ends: List[float] = list(self._ends)
+        self._augment(0, len(self.events))
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def _augment(self, lo: int, hi: int) -> float:
+        # The sorted array is treated as an implicit balanced tree rooted at
+        # each range midpoint, augmented with the latest end in its subtree.
+        if lo >= hi:
+            return float("-inf")
+
+        mid = (lo + hi) // 2
+        self._max_ends[mid] = max(
+            self._ends[mid],
+            self._augment(lo, mid),
+            self._augment(mid + 1, hi),
+        )
+
+        return self._max_ends[mid]
+
+    def _search(
+        self, lo: int, hi: int, limit: int, after: float, found: List[Event]
+    ) -> None:
+        # Always walks the tree from the root built by _augment; `limit`
+        # prunes the subtrees whose events all start too late.
+        if lo >= hi or lo >= limit:
+            return
+
+        mid = (lo + hi) // 2
+
+        if self._max_ends[mid] <= after:
+            return
+
+        self._search(lo, mid, limit, after, found)
+
+        if mid < limit and self._ends[mid] > after:
+            found.append(self.events[mid])
+
+        self._search(mid + 1, hi, limit, after, found)
+
+    def at(self, when: Moment) -> List[Event]:
+        timestamp = when.timestamp()
+        limit = bisect_right(self._starts, timestamp)
+        found: List[Event] = []
+        self._search(0, len(self.events), limit, timestamp, found)
+        return found
+
+    def overlapping(self, start: Moment, end: Moment) -> List[Event]:
+        limit = bisect_left(self._starts, end.timestamp())
+        found: List[Event] = []
+        self._search(0, len(self.events), limit, start.timestamp(), found)
+        return found
+
+    def between(self, start: Moment, end: Moment) -> List[Event]:
+        lo = bisect_left(self._starts, start.timestamp())
+        hi = bisect_left(self._starts, end.timestamp())
+        return self.events[lo:hi]
+
+    def following(self, when: Moment, count: int) -> List[Event]:
+        lo = bisect_left(self._starts, when.timestamp())
+        hi = lo + count
+        return self.events[lo:hi]
+
+    def closest(self, when: Moment) -> Optional[Event]:
+        timestamp = when.timestamp()
+        hi = bisect_left(self._starts, timestamp)
+        candidates = range(max(hi - 1, 0), min(hi + 1, len(self.events)))
+
+        if not candidates:
+            return None
+
+        return self.events[
+            min(candidates, key=lambda i: abs(self._starts[i] - timestamp))
+        ]
+
 
 class EventStorage:
-    def __init__(self, config: Config):
+    def __init__(
+        self,
+        config: Config,
+        concurrent: bool = False,
+        timeout: Optional[float] = None,
+    ):
         self.config = config
-        self.calendars = config.calendars
+        self.concurrent = concurrent
+        self.timeout = timeout
+        self.timings: Dict[str, float] = {}
         self._events: Optional[Dict[str, Iterable[Event]]] = None
+        self._index: Optional[EventIndex] = None
+
+    @property
+    def calendars(self) -> List[BaseCalendar]:
+        return self.config.calendars
 
     def _merge_events(self, event_lists: Iterable[Iterable[Event]]):
         heap = []
@@ -119,7 +1082,7 @@ class EventStorage:
 
         for index, iterator in enumerate(iterators):
             if event := next(iterator, None):
-                heap.append((event.start_time, index, event))
+                heap.append((event.start, index, event))
 
         heapq.heapify(heap)
 
@@ -127,23 +1090,224 @@ class EventStorage:
             _, index, event = heapq.heappop(heap)
 
             if next_event := next(iterators[index], None):
-                heapq.heappush(heap, (next_event.start_time, index, next_event))
+                heapq.heappush(heap, (next_event.start, index, next_event))
 
             yield event
 
+    @staticmethod
+    def _resume(first: Optional[Event], events: Iterator[Event]) -> Iterator[Event]:
+        if first is None:
+            return
+
+        yield first
+
+        try:
+            yield from events
+        except Exception:
+            # A calendar failing mid-stream only loses its remaining events.
+            pass
+
+    def _fetch_calendar(
+        self,
+        calendar: BaseCalendar,
+        ignore_cache: bool,
+        since: Optional[float],
+        results: Dict[str, Iterable[Event]],
+        prefetch: threading.Thread,
+        deadline: Optional[float],
+    ) -> None:
+        start = time.perf_counter()
+
+        try:
+            # A prefetch still running at the deadline is not waited for; the
+            # calendar then syncs on its own within what is left of the time.
+            prefetch.join(self._remaining(deadline))
+
+            with span("calendar.fetch", calendar=calendar.name):
+                # Pulling the first event loads the cache or fetches on this
+                # thread; the rest is read lazily as the streams are merged.
+                events = iter(calendar.get_events(ignore_cache, since=since))
+                first = next(events, None)
+
+            results[calendar.name] = self._resume(first, events)
+        except Exception:
+            results[calendar.name] = []
+        finally:
+            self.timings[calendar.name] = time.perf_counter() - start
+
+    def _fetch_concurrently(
+        self, ignore_cache: bool, since: Optional[float]
+    ) -> Dict[str, Iterable[Event]]:
+        results: Dict[str, Iterable[Event]] = {}
+
+        # Steps that may wait for the user run before the deadline starts.
+        for calendars in self._providers():
+            try:
+                calendars[0].authorize(calendars)
+            except Exception:
+                pass
+
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        prefetches: Dict[str, threading.Thread] = {}
+
+        for calendars in self._providers():
+            prefetch = threading.Thread(
+                target=self._prefetch, args=(calendars, ignore_cache), daemon=True
+            )
+            prefetch.start()
+            prefetches.update((c.name, prefetch) for c in calendars)
+
+        threads = [
+            threading.Thread(
+                target=self._fetch_calendar,
+                args=(
+                    calendar,
+                    ignore_cache,
+                    since,
+                    results,
+                    prefetches[calendar.name],
+                    deadline,
+                ),
+                daemon=True,
+            )
+            for calendar in self.calendars
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        # Daemon threads still running past the deadline are left behind, so
+        # one slow account only drops its own events from the merged agenda.
+        for thread in threads:
+            thread.join(self._remaining(deadline))
+
+        return {c.name: results.get(c.name, []) for c in self.calendars}
+
+    def _providers(self) -> Iterable[List[BaseCalendar]]:
+        providers: Dict[type, List[BaseCalendar]] = {}
+
+        for calendar in self.calendars:
+            providers.setdefault(type(calendar), []).append(calendar)
+
+        return providers.values()
+
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        return None if deadline is None else max(deadline - time.monotonic(), 0)
+
+    def _prefetch(self, calendars: List[BaseCalendar], ignore_cache: bool) -> None:
+        try:
+            calendars[0].prefetch(calendars, ignore_cache)
+        except Exception:
+            # Calendars left without prefetched data fetch on their own.
+            pass
+
+    def _fetch(
+        self, ignore_cache: bool, since: Optional[float] = None
+    ) -> Dict[str, Iterable[Event]]:
+        if self.concurrent:
+            return self._fetch_concurrently(ignore_cache, since)
+
+        for calendars in self._providers():
+            self._prefetch(calendars, ignore_cache)
+
+        return {c.name: c.get_events(ignore_cache, since=since) for c in self.calendars}
+
     def get_events(self, ignore_cache: bool = False) -> Iterable[Event]:
+        if self._index is not None and not ignore_cache:
+            return iter(self._index.events)
+
         if self._events is None or ignore_cache:
-            self._events = {c.name: c.get_events(ignore_cache) for c in self.calendars}
+            self._index = None
+            self._events = self._fetch(ignore_cache)
 
         return self._merge_events(self._events.values())
 
-    def get_closest_event(self, ignore_cache: bool = False) -> Event:
-        now = Arrow.now()
+    def list_events(self, ignore_cache: bool = False) -> List[Event]:
+        # Calendars are read as their streams are merged, so this span covers
+        # both; callers that stop early drain the merge themselves.
+        with span("storage.merge"):
+            return list(self.get_events(ignore_cache))
 
-        return min(
-            self.get_events(ignore_cache),
-            key=lambda e: abs((now - e.start_time).total_seconds()),
-        )
+    def _get_events_since(
+        self, timestamp: float, ignore_cache: bool
+    ) -> Iterable[Event]:
+        if self._events is not None and not ignore_cache:
+            events = self.get_events()
+        else:
+            # Nothing is kept from a partial read, so later queries load in full.
+            self._events = self._index = None
+            events = self._merge_events(self._fetch(ignore_cache, timestamp).values())
+
+        return dropwhile(lambda e: e.start < timestamp, events)
+
+    def get_index(self, ignore_cache: bool = False) -> EventIndex:
+        if self._index is None or ignore_cache:
+            with span("storage.index"):
+                self._index = EventIndex(self.list_events(ignore_cache))
+
+        return self._index
+
+    def get_events_at(self, when: Moment, ignore_cache: bool = False) -> List[Event]:
+        return self.get_index(ignore_cache).at(when)
+
+    def get_events_between(
+        self, start: Moment, end: Moment, ignore_cache: bool = False
+    ) -> List[Event]:
+        if self._index is not None and not ignore_cache:
+            return self._index.between(start, end)
+
+        timestamp = end.timestamp()
+        events = self._get_events_since(start.timestamp(), ignore_cache)
+
+        with span("storage.between"):
+            return list(takewhile(lambda e: e.start < timestamp, events))
+
+    def get_overlapping_events(
+        self, start: Moment, end: Moment, ignore_cache: bool = False
+    ) -> List[Event]:
+        return self.get_index(ignore_cache).overlapping(start, end)
+
+    def get_closest_event(
+        self, ignore_cache: bool = False, when: Optional[Moment] = None
+    ) -> Optional[Event]:
+        moment = when or Arrow.now()
+
+        if self._index is not None and not ignore_cache:
+            return self._index.closest(moment)
+
+        # The merged stream is sorted by start time, so the closest event is
+        # either the last one starting before `when` or the first one after.
+        timestamp = moment.timestamp()
+        previous: Optional[Event] = None
+
+        with span("storage.closest"):
+            for event in self.get_events(ignore_cache):
+                if event.start > timestamp:
+                    if (
+                        previous
+                        and timestamp - previous.start <= event.start - timestamp
+                    ):
+                        return previous
+
+                    return event
+
+                previous = event
+
+        return previous
+
+    def get_next_events(
+        self, count: int, ignore_cache: bool = False, when: Optional[Moment] = None
+    ) -> List[Event]:
+        moment = when or Arrow.now()
+
+        if self._index is not None and not ignore_cache:
+            return self._index.following(moment, count)
+
+        upcoming = self._get_events_since(moment.timestamp(), ignore_cache)
+
+        with span("storage.next"):
+            return list(islice(upcoming, count))
 
     def join_event(self, event: Event) -> None:
         if event.video_link:
@@ -1,21 +1,46 @@
 from __future__ import annotations
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import datetime, timezone
 import os
+import sys
+import threading
 from enum import Enum
-from typing import TYPE_CHECKING, Dict, List
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ClassVar,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
 import arrow
-from google.oauth2.credentials import Credentials  # type: ignore
-from google_auth_oauthlib.flow import InstalledAppFlow  # type: ignore
-from google.auth.exceptions import RefreshError  # type: ignore
-from google.auth.transport.requests import Request  # type: ignore
-from googleapiclient.errors import HttpError
-from googleapiclient.discovery import build
+from arrow.parser import ParserError
 
+# The Google client libraries take longer to import than a cached lookup
+# takes to answer, so they are only imported once the API is actually used.
 if TYPE_CHECKING:
     from googleapiclient._apis.calendar.v3.schemas import Event as GoogleEvent
-
-from pycal.api import BaseCalendar, Event, EventStatus, JsonCacheManager
+    from googleapiclient._apis.calendar.v3.schemas import EventDateTime
+
+from pycal.api import (
+    BaseCalendar,
+    CacheManager,
+    Event,
+    EventCache,
+    EventStatus,
+    JsonCacheManager,
+    RecurringEvent,
+    SqliteCacheManager,
+    get_tz_id,
+    get_tzinfo,
+    recurrence_stamp,
+)
+from pycal.tracing import span
 
 
 class GoogleEventStatus(Enum):
@@ -25,17 +50,94 @@ class GoogleEventStatus(Enum):
     tentative = EventStatus.NOT_ANSWERED
 
 
+RESPONSES = {status.name: status.value for status in GoogleEventStatus}
+
+_TZ_IDS: Dict[str, str] = {}
+
+
+def parse_time(when: EventDateTime) -> Tuple[int, str]:
+    if not (value := when.get("dateTime")):
+        # All-day events carry a bare date and span local midnights.
+        return int(datetime.fromisoformat(when["date"]).timestamp()), "local"
+
+    if value[-1] == "Z":
+        value = value[:-1] + "+00:00"
+
+    moment = datetime.fromisoformat(value)
+
+    # Naive values are read as UTC, matching arrow.get.
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+
+    offset = value[19:]
+
+    if (tz := _TZ_IDS.get(offset)) is None:
+        tz = _TZ_IDS[offset] = get_tz_id(moment)
+
+    return int(moment.timestamp()), tz
+
+
+class SyncTokenExpired(Exception):
+    pass
+
+
+class HttpPool:
+    # httplib2 connections are not thread safe, so each request borrows an
+    # Http and hands it back with its keep-alive connections still open.
+    def __init__(self) -> None:
+        self._idle: List[Any] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        from googleapiclient.http import build_http
+
+        with self._lock:
+            http = self._idle.pop() if self._idle else None
+
+        if http is None:
+            http = build_http()
+
+        try:
+            yield http
+        finally:
+            with self._lock:
+                self._idle.append(http)
+
+
+HTTP_POOL = HttpPool()
+
+
 class GoogleCredentials:
     SCOPES = [
         "https://www.googleapis.com/auth/calendar.events",
     ]
 
+    _registry: ClassVar[Dict[str, "GoogleCredentials"]] = {}
+    _registry_lock = threading.Lock()
+
     def __init__(self, credentials_file: str):
         self.credentials_file = credentials_file
         self.token_file = credentials_file.replace(".json", ".token.json")
         self._authorization = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_file(cls, credentials_file: str) -> "GoogleCredentials":
+        # Calendars of one account share its token and its refreshes.
+        with cls._registry_lock:
+            if credentials_file not in cls._registry:
+                cls._registry[credentials_file] = cls(credentials_file)
+
+            return cls._registry[credentials_file]
+
+    @property
+    def needs_consent(self) -> bool:
+        return self._authorization is None and not os.path.exists(self.token_file)
 
     def _authorize_from_credentials(self) -> bool:
+        from google_auth_oauthlib.flow import InstalledAppFlow  # type: ignore
+
         self._authorization = InstalledAppFlow.from_client_secrets_file(
             self.credentials_file,
             self.SCOPES,
@@ -45,6 +147,8 @@ class GoogleCredentials:
         return self._authorization is not None and self._authorization.valid
 
     def _authorize_from_token(self) -> bool:
+        from google.oauth2.credentials import Credentials  # type: ignore
+
         if not os.path.exists(self.token_file):
             return False
 
@@ -67,112 +171,549 @@ class GoogleCredentials:
         if not self._authorization:
             return
 
-        request = Request()
+        from google_auth_httplib2 import Request  # type: ignore
 
-        try:
-            self._authorization.refresh(request)
-        finally:
-            if request.session:
-                request.session.close()
+        with HTTP_POOL.connection() as http, span("google.credentials.refresh"):
+            self._authorization.refresh(Request(http))
 
     def _save_authorization(self) -> None:
         if not self._authorization:
             raise
 
-        with open(self.token_file, "w") as token:
+        temp_file = f"{self.token_file}.{os.getpid()}.tmp"
+
+        with open(temp_file, "w") as token:
             token.write(self._authorization.to_json())
 
+        os.replace(temp_file, self.token_file)
+
     def get_authorization(self):
-        if not self._authorization or not self._authorization.valid:
-            authorized = False
+        from google.auth.exceptions import RefreshError  # type: ignore
 
-            try:
-                authorized = self._authorize_from_token()
-            except RefreshError:
-                pass
+        if self._authorization and self._authorization.valid:
+            return self._authorization
+
+        # Tokens stop being valid a few minutes before they expire; the first
+        # thread to notice refreshes it while the others wait for the result.
+        with self._lock:
+            if not self._authorization or not self._authorization.valid:
+                authorized = False
+
+                try:
+                    authorized = self._authorize_from_token()
+                except RefreshError:
+                    pass
 
-            if not authorized:
-                self._authorize_from_credentials()
+                if not authorized:
+                    self._authorize_from_credentials()
 
         return self._authorization
 
 
 class GoogleCalendarAPI:
-    def get_events(self, max_results: int = 10) -> List["GoogleEvent"]:
+    PAGE_SIZE = 250
+    DISCOVERY_URL = "https://calendar.googleapis.com/$discovery/rest?version=v3"
+    DISCOVERY_FILE = os.path.expanduser("~/.pycal.discovery.json")
+
+    BATCH_SIZE = 50
+
+    _root: ClassVar[Any] = None
+    _service: ClassVar[Any] = None
+    _lock = threading.Lock()
+
+    def _sync_params(
+        self, sync_token: Optional[str], page_size: int = PAGE_SIZE
+    ) -> Dict[str, Any]:
+        # Recurring events arrive as one series plus its modified or
+        # cancelled instances instead of one copy per occurrence.
+        params: Dict[str, Any] = {
+            "calendarId": self.calendar_id,
+            "maxResults": page_size,
+            "singleEvents": False,
+        }
+
+        if sync_token:
+            params["syncToken"] = sync_token
+        else:
+            params["timeMin"] = self._format_time(datetime.now(timezone.utc))
+
+        return params
+
+    def get_events(
+        self,
+        time_min: Optional[datetime] = None,
+        time_max: Optional[datetime] = None,
+        page_size: int = PAGE_SIZE,
+    ) -> Iterator["GoogleEvent"]:
+        # A plain listing of one instance per occurrence in start order; the
+        # incremental sync used by GoogleCalendar goes through sync_events.
+        params: Dict[str, Any] = {
+            "calendarId": self.calendar_id,
+            "timeMin": self._format_time(time_min or datetime.now(timezone.utc)),
+            "maxResults": page_size,
+            "singleEvents": True,
+            "orderBy": "startTime",
+        }
+
+        if time_max:
+            params["timeMax"] = self._format_time(time_max)
+
+        yield from self._pages(params)
+
+    def sync_events(
+        self, sync_token: Optional[str] = None, page_size: int = PAGE_SIZE
+    ) -> Generator["GoogleEvent", None, Optional[str]]:
+        # Yields each page's events as it arrives and returns the token for
+        # the next sync once the last page has been read.
+        return (yield from self._pages(self._sync_params(sync_token, page_size)))
+
+    def _pages(
+        self, params: Dict[str, Any]
+    ) -> Generator["GoogleEvent", None, Optional[str]]:
+        from googleapiclient.errors import HttpError
+
         try:
-            events_result = self.service.list(
-                calendarId="primary",
-                timeMin=datetime.utcnow().isoformat() + "Z",
-                maxResults=max_results,
-                singleEvents=True,
-                orderBy="startTime",
-            ).execute()
-
-            return events_result.get("items", [])
-        except HttpError:
-            return []
-        finally:
-            self.service.close()
+            while True:
+                with span("google.list"), self.authorized_http() as http:
+                    events_result = self.service.list(**params).execute(http=http)
 
-    def __init__(self, credentials_file: str):
-        self._credentials = GoogleCredentials(credentials_file)
-        self._service = None
+                yield from events_result.get("items", [])
+
+                if not (page_token := events_result.get("nextPageToken")):
+                    return events_result.get("nextSyncToken")
+
+                params["pageToken"] = page_token
+        except HttpError as error:
+            if error.resp.status == 410:
+                raise SyncTokenExpired() from error
+
+            raise
+
+    def batch(self, requests: List[Any]) -> List[Tuple[Any, Optional[Exception]]]:
+        responses: Dict[str, Tuple[Any, Optional[Exception]]] = {}
+
+        def collect(request_id: str, response: Any, exception: Exception) -> None:
+            responses[request_id] = response, exception
+
+        # Requests built from the shared resource are sent through Google's
+        # batch endpoint, at most BATCH_SIZE to a call, with this account's
+        # authorization.
+        with self.authorized_http() as http:
+            for offset in range(0, len(requests), self.BATCH_SIZE):
+                end = offset + self.BATCH_SIZE
+                batch = self.root.new_batch_http_request(callback=collect)
+
+                for index, request in enumerate(requests[offset:end], offset):
+                    request.http = http
+                    batch.add(request, request_id=str(index))
+
+                with span("google.batch", requests=len(requests[offset:end])):
+                    batch.execute(http=http)
+
+        return [responses[str(index)] for index in range(len(requests))]
+
+    @classmethod
+    def sync_batch(
+        cls, sync_tokens: Dict["GoogleCalendarAPI", Optional[str]]
+    ) -> Dict["GoogleCalendarAPI", Any]:
+        accounts: Dict[str, List[GoogleCalendarAPI]] = {}
+
+        for api in sync_tokens:
+            accounts.setdefault(api.credentials_file, []).append(api)
+
+        results: Dict[GoogleCalendarAPI, Any] = {}
+
+        # Calendars of the same account are listed together, one page of
+        # each per batch until all of them reach their next sync token.
+        for apis in accounts.values():
+            if len(apis) < 2:
+                continue
+
+            params = {api: api._sync_params(sync_tokens[api]) for api in apis}
+            events: Dict[GoogleCalendarAPI, List[GoogleEvent]] = {}
+
+            while params:
+                pending = list(params)
+                responses = apis[0].batch(
+                    [api.service.list(**params[api]) for api in pending]
+                )
+
+                for api, (response, error) in zip(pending, responses):
+                    if error is not None:
+                        results[api] = cls._sync_error(error)
+                        del params[api]
+                        continue
+
+                    events.setdefault(api, []).extend(response.get("items", []))
+
+                    if page_token := response.get("nextPageToken"):
+                        params[api]["pageToken"] = page_token
+                    else:
+                        results[api] = events[api], response.get("nextSyncToken")
+                        del params[api]
+
+        return results
+
+    @staticmethod
+    def _sync_error(error: Exception) -> Exception:
+        if getattr(getattr(error, "resp", None), "status", None) == 410:
+            return SyncTokenExpired()
+
+        return error
+
+    @staticmethod
+    def _format_time(value: datetime) -> str:
+        if value.tzinfo is None:
+            return value.isoformat() + "Z"
+
+        return value.isoformat()
+
+    def __init__(self, credentials_file: str, calendar_id: str = "primary"):
+        self.credentials_file = credentials_file
+        self.calendar_id = calendar_id
+        self._credentials = GoogleCredentials.for_file(credentials_file)
+
+    @classmethod
+    def _discovery_document(cls) -> str:
+        from googleapiclient.discovery_cache import get_static_doc
+
+        if document := get_static_doc("calendar", "v3"):
+            return document
+
+        # Clients that do not bundle discovery documents fetch it once and
+        # keep a copy for later runs.
+        try:
+            with open(cls.DISCOVERY_FILE) as f:
+                return f.read()
+        except OSError:
+            pass
+
+        from googleapiclient.errors import HttpError
+        from googleapiclient.http import build_http
+
+        response, content = build_http().request(cls.DISCOVERY_URL)
+
+        if response.status >= 400:
+            raise HttpError(response, content, uri=cls.DISCOVERY_URL)
+
+        document = content.decode()
+
+        temp_file = f"{cls.DISCOVERY_FILE}.{os.getpid()}.tmp"
+
+        with open(temp_file, "w") as f:
+            f.write(document)
+
+        os.replace(temp_file, cls.DISCOVERY_FILE)
+        return document
+
+    def _build(self) -> None:
+        from googleapiclient.discovery import build_from_document
+        from googleapiclient.http import build_http
+
+        # Generating the resource from the discovery document is the costly
+        # part of `build`, so one unauthenticated resource is shared by every
+        # calendar and each request is executed with its account's http.
+        with self._lock:
+            if GoogleCalendarAPI._root is None:
+                with span("google.discovery.build"):
+                    root = build_from_document(
+                        self._discovery_document(), http=build_http()
+                    )
+                    GoogleCalendarAPI._service = root.events()
+                    GoogleCalendarAPI._root = root
+
+    @property
+    def root(self):
+        self._build()
+        return GoogleCalendarAPI._root
 
     @property
     def service(self):
-        if not self._service:
-            self._service = build(
-                "calendar",
-                "v3",
-                credentials=self._credentials.get_authorization(),
-            ).events()
+        self._build()
+        return GoogleCalendarAPI._service
+
+    def authorize(self) -> None:
+        # Accounts authorized before only need their token, not the user.
+        if self._credentials.needs_consent:
+            self._credentials.get_authorization()
 
-        return self._service
+    @contextmanager
+    def authorized_http(self) -> Iterator[Any]:
+        from google_auth_httplib2 import AuthorizedHttp
+
+        with span("google.authorize"):
+            credentials = self._credentials.get_authorization()
+
+        with HTTP_POOL.connection() as http:
+            yield AuthorizedHttp(credentials, http=http)
 
 
 class GoogleCalendar(BaseCalendar["GoogleEvent"]):
+    service: GoogleCalendarAPI
+
+    # Bumped whenever cached events change shape, so caches and sync tokens
+    # written by older versions are dropped for a full sync. Version 2 keeps
+    # recurring events as series rather than expanded instances.
+    CACHE_FORMAT = "2"
+
+    # The sync token a prefetch was made with and its result.
+    _prefetched: Optional[Tuple[Optional[str], Any]] = None
+
     @classmethod
     def from_settings(cls, name: str, config: Dict) -> "GoogleCalendar":
         credentials_file = os.path.expanduser(config["credentials"])
+        cache_file = os.path.expanduser(f"~/agenda.{name.lower().replace(' ', '_')}")
 
         return cls(
             name,
-            service=GoogleCalendarAPI(credentials_file),
-            cache_manager=JsonCacheManager(
-                os.path.expanduser(
-                    f"~/agenda.{name.lower().replace(' ', '_')}.json",
-                )
+            service=GoogleCalendarAPI(
+                credentials_file, config.get("calendarId", "primary")
             ),
+            cache_manager=cls._cache_manager(name, config.get("cache", "json")),
+            ttl=config.get("ttl", 600),
+            max_stale=config.get("max_stale", 0),
+            event_cache=EventCache(f"{cache_file}.events"),
+            horizon=config.get("horizon", 365),
+            lock_file=f"{cache_file}.lock",
+            ttl_bounds=config.get("adaptive_ttl"),
         )
 
-    def _parse_user_response(self, event: GoogleEvent) -> EventStatus:
-        for attendee in event.get("attendees", []):
-            if attendee.get("self"):
-                response = attendee.get("responseStatus", "needsAction")
-                return GoogleEventStatus[response].value
+    @classmethod
+    def authorize(cls, calendars: List[BaseCalendar]) -> None:
+        for calendar in calendars:
+            if isinstance(calendar, GoogleCalendar):
+                calendar.service.authorize()
 
-        return GoogleEventStatus.needsAction.value
+    @classmethod
+    def prefetch(cls, calendars: List[BaseCalendar], ignore_cache: bool) -> None:
+        sync_tokens = {}
 
-    def _parse_event(self, event: GoogleEvent) -> Event:
-        try:
-            start: arrow.Arrow = arrow.get(event["start"]["dateTime"])
-            end: arrow.Arrow = arrow.get(event["end"]["dateTime"])
-            event_type: str = (
-                event.get("conferenceData", {})
-                .get("conferenceSolution", {})
-                .get("name", "-")
+        for calendar in calendars:
+            if isinstance(calendar, GoogleCalendar) and calendar._needs_refresh(
+                ignore_cache
+            ):
+                sync_tokens[calendar.service] = calendar, calendar._sync_token()
+
+        if len(sync_tokens) < 2:
+            return
+
+        results = GoogleCalendarAPI.sync_batch(
+            {api: token for api, (_, token) in sync_tokens.items()}
+        )
+
+        for api, result in results.items():
+            calendar, token = sync_tokens[api]
+            calendar._prefetched = token, result
+
+    def _cache_key(self) -> str:
+        return self.CACHE_FORMAT
+
+    def _sync_token(self) -> Optional[str]:
+        metadata = self.cache_manager.metadata
+
+        if metadata.get("key", "") != self._cache_key():
+            return None
+
+        return metadata.get("sync_token")
+
+    def _sync_events(
+        self, sync_token: Optional[str]
+    ) -> Generator[GoogleEvent, None, Optional[str]]:
+        prefetched, self._prefetched = self._prefetched, None
+
+        if prefetched is None or prefetched[0] != sync_token:
+            return self.service.sync_events(sync_token)
+
+        if isinstance(prefetched[1], Exception):
+            raise prefetched[1]
+
+        return self._replay(*prefetched[1])
+
+    @staticmethod
+    def _replay(
+        events: List[GoogleEvent], sync_token: Optional[str]
+    ) -> Generator[GoogleEvent, None, Optional[str]]:
+        yield from events
+        return sync_token
+
+    @staticmethod
+    def _apply_changes(
+        events: Dict[str, GoogleEvent],
+        changes: Generator[GoogleEvent, None, Optional[str]],
+    ) -> Tuple[int, Optional[str]]:
+        count = 0
+
+        # Changes are applied page by page as they arrive; the generator's
+        # return value is the token for the next sync.
+        while True:
+            try:
+                change = next(changes)
+            except StopIteration as stop:
+                return count, stop.value
+
+            count += 1
+
+            # Cancelled instances of a series are kept as its exceptions.
+            if change.get("status") == "cancelled" and "recurringEventId" not in change:
+                events.pop(change["id"], None)
+            else:
+                events[change["id"]] = change
+
+    @classmethod
+    def _cache_manager(cls, name: str, cache: str) -> CacheManager:
+        if cache == "sqlite":
+            return SqliteCacheManager(
+                os.path.expanduser("~/.pycal.db"), name, cls._event_key
             )
 
-            return Event(
-                id=event["id"],
-                title=event["summary"],
-                start_time=start,
-                end_time=end,
-                location=event.get("location", "-"),
-                going=self._parse_user_response(event),
-                type=event_type,
-                video_link=event.get("hangoutLink"),
-                calendar=self.name,
+        return JsonCacheManager(
+            os.path.expanduser(
+                f"~/agenda.{name.lower().replace(' ', '_')}.json",
             )
-        except KeyError:
-            raise
+        )
+
+    @staticmethod
+    def _event_key(event: GoogleEvent) -> Tuple[str, float, float, bool]:
+        start = GoogleCalendar._start(event)
+        end = parse_time(event["end"])[0] if "end" in event else start
+        is_series = "recurrence" in event or "recurringEventId" in event
+        return event["id"], start, end, is_series
+
+    @staticmethod
+    def _start(event: GoogleEvent) -> int:
+        # Cancelled instances of a series only carry their original start.
+        return parse_time(event.get("start") or event["originalStartTime"])[0]
+
+    @staticmethod
+    def _is_current(event: GoogleEvent, now: float) -> bool:
+        if "recurrence" in event:
+            return True
+
+        if event.get("status") == "cancelled":
+            return parse_time(event["originalStartTime"])[0] + 86400 > now
+
+        return parse_time(event["end"])[0] > now
+
+    def _refresh_events(self, cached: List[GoogleEvent]) -> Iterable[Event]:
+        from googleapiclient.errors import HttpError
+
+        sync_token = self._sync_token()
+        events = {event["id"]: event for event in cached} if sync_token else {}
+
+        # A failed sync, incremental or full, leaves the cached events in use.
+        try:
+            try:
+                with span("google.sync", calendar=self.name):
+                    changes, next_sync_token = self._apply_changes(
+                        events, self._sync_events(sync_token)
+                    )
+            except SyncTokenExpired:
+                sync_token = None
+                events = {}
+
+                with span("google.sync", calendar=self.name, full=True):
+                    changes, next_sync_token = self._apply_changes(
+                        events, self.service.sync_events()
+                    )
+        except HttpError:
+            yield from self._parse_events(cached)
+            return
+
+        # Deltas arrive in modification order and may touch past events, so
+        # the merged set is re-sorted and pruned before it is cached.
+        now = arrow.now().timestamp()
+        current = sorted(
+            (event for event in events.values() if self._is_current(event, now)),
+            key=self._start,
+        )
+
+        upcoming = self._parse_events(current)
+        self._build_cache(
+            current,
+            upcoming,
+            changed=bool(changes) if sync_token else None,
+            key=self._cache_key(),
+            sync_token=next_sync_token,
+        )
+
+        yield from upcoming
+
+    def _parse_user_response(self, event: GoogleEvent) -> EventStatus:
+        for attendee in event.get("attendees", ()):
+            if attendee.get("self"):
+                return RESPONSES[attendee.get("responseStatus", "needsAction")]
+
+        return EventStatus.NOT_ANSWERED
+
+    def _parse_event(
+        self, event: GoogleEvent, exceptions: Optional[Dict[str, List[str]]] = None
+    ) -> Optional[Event]:
+        # Cancelled instances only exclude their occurrence from the series.
+        if event.get("status") == "cancelled":
+            return None
+
+        start, tz = parse_time(event["start"])
+        end, _ = parse_time(event["end"])
+        event_type = "-"
+
+        if conference := event.get("conferenceData"):
+            event_type = conference.get("conferenceSolution", {}).get("name", "-")
+
+        parsed_event = Event.from_epochs(
+            id=event["id"],
+            title=event["summary"],
+            start=start,
+            end=end,
+            tz=tz,
+            location=event.get("location", "-"),
+            going=self._parse_user_response(event),
+            type=event_type,
+            video_link=event.get("hangoutLink"),
+            calendar=self.name,
+        )
+
+        if "recurrence" in event:
+            return self._parse_series(parsed_event, event, exceptions or {})
+
+        return parsed_event
+
+    def _parse_events(self, events: Iterable[GoogleEvent]) -> List[Event]:
+        with span("parse", calendar=self.name):
+            events = list(events)
+            exceptions = self._exceptions(events)
+            parsed = (self._parse_event(event, exceptions) for event in events)
+
+            return [event for event in parsed if event is not None]
+
+    @staticmethod
+    def _exceptions(events: List[GoogleEvent]) -> Dict[str, List[str]]:
+        exceptions: Dict[str, List[str]] = {}
+
+        # Modified and cancelled instances replace the occurrence they were
+        # generated as, so it is excluded from the series.
+        for event in events:
+            if original := event.get("originalStartTime"):
+                exceptions.setdefault(event["recurringEventId"], []).append(
+                    f"EXDATE:{recurrence_stamp(*parse_time(original))}"
+                )
+
+        return exceptions
+
+    @staticmethod
+    def _parse_series(
+        event: Event, payload: GoogleEvent, exceptions: Dict[str, List[str]]
+    ) -> RecurringEvent:
+        rule = "\n".join(payload["recurrence"] + exceptions.get(event.id, []))
+        series = RecurringEvent.from_event(event, rule)
+
+        # Instances are generated in the series' own zone so they keep their
+        # wall-clock time across daylight saving changes.
+        if (zone := payload["start"].get("timeZone")) and event.tz != "local":
+            try:
+                get_tzinfo(zone)
+            except ParserError:
+                return series
+
+            series.tz = sys.intern(zone)
+
+        return series
@@ -0,0 +1,380 @@
+import hashlib
+import json
+import os
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import arrow
+from arrow.parser import ParserError
+
+from pycal.api import (
+    BaseCalendar,
+    Event,
+    EventCache,
+    EventStatus,
+    JsonCacheManager,
+    RecurringEvent,
+    get_tzinfo,
+    recurrence_stamp,
+)
+from pycal.tracing import span
+
+
+IcsEvent = Dict
+
+STATUSES = {
+    "CONFIRMED": EventStatus.ACCEPTED,
+    "TENTATIVE": EventStatus.NOT_ANSWERED,
+}
+
+DURATION = re.compile(
+    r"(?P<sign>[+-])?P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?"
+)
+
+ESCAPES = re.compile(r"\\([\\;,nN])")
+
+# Only these properties are parsed; descriptions, attendees and the like are
+# skipped before their parameters are split.
+PROPERTIES = (
+    "DTSTART",
+    "DTEND",
+    "DURATION",
+    "UID",
+    "SUMMARY",
+    "LOCATION",
+    "URL",
+    "STATUS",
+    "RRULE",
+    "RDATE",
+    "EXDATE",
+    "RECURRENCE-ID",
+)
+
+RULES = ("RRULE", "RDATE", "EXDATE")
+
+
+def unfold(lines: Iterable[str]) -> Iterator[str]:
+    current: Optional[str] = None
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+
+        # Long content lines are folded onto lines starting with whitespace.
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+
+        if current is not None:
+            yield current
+
+        current = line
+
+    if current:
+        yield current
+
+
+def parse_line(line: str) -> Tuple[str, Dict[str, str], str]:
+    colon = line.find(":")
+    semicolon = line.find(";")
+
+    if semicolon == -1 or semicolon > colon:
+        return line[:colon].upper(), {}, line[colon:][1:]
+
+    name = line[:semicolon].upper()
+    params: Dict[str, str] = {}
+    position = semicolon
+
+    # Parameter values may be quoted and contain ':' or ';'.
+    while line[position] == ";":
+        equals = line.index("=", position)
+        key = line[position:equals][1:].upper()
+        position = equals + 1
+
+        if line[position] == '"':
+            end = line.index('"', position + 1)
+            params[key] = line[position:end][1:]
+            position = end + 1
+        else:
+            end = line.find(":", position)
+
+            if -1 < (semicolon := line.find(";", position)) < end:
+                end = semicolon
+
+            params[key] = line[position:end]
+            position = end
+
+    return name, params, line[position:][1:]
+
+
+def unescape(value: str) -> str:
+    return ESCAPES.sub(lambda m: "\n" if m[1] in "nN" else m[1], value)
+
+
+TEXT: Dict[str, Tuple[str, Callable[[str], str]]] = {
+    "UID": ("id", str),
+    "SUMMARY": ("title", unescape),
+    "LOCATION": ("location", unescape),
+    "URL": ("url", str),
+}
+
+
+def parse_time(value: str, params: Dict[str, str]) -> Tuple[int, str, bool]:
+    year, month, day = int(value[:4]), int(value[4:6]), int(value[6:8])
+
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return int(datetime(year, month, day).timestamp()), "local", True
+
+    moment = datetime(
+        year, month, day, int(value[9:11]), int(value[11:13]), int(value[13:15])
+    )
+
+    if value.endswith("Z"):
+        return int(moment.replace(tzinfo=timezone.utc).timestamp()), "UTC", False
+
+    if tz := params.get("TZID"):
+        try:
+            zone = get_tzinfo(tz)
+        except ParserError:
+            # Non-IANA zone names (e.g. from Outlook) are read as local time.
+            return int(moment.timestamp()), "local", False
+
+        return int(moment.replace(tzinfo=zone).timestamp()), sys.intern(tz), False
+
+    return int(moment.timestamp()), "local", False
+
+
+def parse_duration(value: str) -> int:
+    if not (match := DURATION.fullmatch(value)):
+        return 0
+
+    parts = {k: int(v) for k, v in match.groupdict().items() if v and k != "sign"}
+    seconds = int(timedelta(**parts).total_seconds())
+    return -seconds if match["sign"] == "-" else seconds
+
+
+def read_events(
+    lines: Iterable[str], time_min: float, time_max: float, source: str = ""
+) -> Iterator[IcsEvent]:
+    event: Optional[IcsEvent] = None
+    skip = False
+    depth = 0
+
+    # Properties of nested components (alarms) and of events already known
+    # to be outside the window are never parsed.
+    for line in unfold(lines):
+        if line == "BEGIN:VEVENT":
+            event, skip, depth = {"file": source}, False, 0
+        elif line == "END:VEVENT":
+            if event is not None and not skip and _finish(event, time_min):
+                yield event
+
+            event = None
+        elif event is None or skip:
+            continue
+        elif line[:6] == "BEGIN:":
+            depth += 1
+        elif line[:4] == "END:":
+            depth -= 1
+        elif not depth:
+            skip = _read_property(event, line, time_min, time_max)
+
+
+def _read_property(
+    event: IcsEvent, line: str, time_min: float, time_max: float
+) -> bool:
+    if not line.startswith(PROPERTIES):
+        return False
+
+    name, params, value = parse_line(line)
+
+    if name == "DTSTART":
+        event["start"], event["tz"], event["all_day"] = parse_time(value, params)
+        return event["start"] >= time_max
+
+    if name == "STATUS":
+        event["status"] = value.upper()
+        return False
+
+    # Series are kept whole since later instances may still be upcoming.
+    if name in RULES:
+        event.setdefault("rules", []).append(line)
+    elif name == "RECURRENCE-ID":
+        event["recurrence_id"] = parse_time(value, params)[:2]
+    elif name == "DTEND":
+        event["end"] = parse_time(value, params)[0]
+    elif name == "DURATION":
+        event["duration"] = parse_duration(value)
+    elif name in TEXT:
+        key, convert = TEXT[name]
+        event[key] = convert(value)
+
+    return False
+
+
+def _finish(event: IcsEvent, time_min: float) -> bool:
+    if "start" not in event:
+        return False
+
+    # Cancelled instances of a series are kept so they can be excluded from
+    # it; other cancelled events are dropped.
+    if event.get("status") == "CANCELLED" and "recurrence_id" not in event:
+        return False
+
+    all_day = event.pop("all_day")
+    duration = event.pop("duration", 86400 if all_day else 0)
+    event.setdefault("end", event["start"] + duration)
+    return event["end"] > time_min or "rules" in event
+
+
+class IcsCalendarAPI:
+    def __init__(self, path: str, horizon: int = 365):
+        self.path = path
+        self.horizon = horizon
+
+    def files(self) -> List[str]:
+        if not os.path.isdir(self.path):
+            return [self.path]
+
+        return sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(self.path)
+            for name in names
+            if name.lower().endswith(".ics")
+        )
+
+    def fingerprint(self) -> Dict[str, List[int]]:
+        stamps = {}
+
+        for path in self.files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            stamps[path] = [stat.st_mtime_ns, stat.st_size]
+
+        return stamps
+
+    def window(self) -> Tuple[float, float]:
+        now = arrow.now().timestamp()
+        return now, now + self.horizon * 86400
+
+    def read_file(self, path: str) -> List[IcsEvent]:
+        time_min, time_max = self.window()
+
+        with span("ics.read", file=path):
+            with open(path, encoding="utf-8", errors="replace", newline="") as f:
+                return list(read_events(f, time_min, time_max, path))
+
+    def get_events(self) -> Iterator[IcsEvent]:
+        for path in self.fingerprint():
+            yield from self.read_file(path)
+
+
+class IcsCalendar(BaseCalendar[IcsEvent]):
+    service: IcsCalendarAPI
+
+    @classmethod
+    def from_settings(cls, name: str, config: Dict) -> "IcsCalendar":
+        cache_file = os.path.expanduser(f"~/agenda.{name.lower().replace(' ', '_')}")
+
+        horizon = config.get("horizon", 365)
+
+        return cls(
+            name,
+            service=IcsCalendarAPI(os.path.expanduser(config["path"]), horizon),
+            cache_manager=JsonCacheManager(f"{cache_file}.json"),
+            ttl=config.get("ttl", 86400),
+            event_cache=EventCache(f"{cache_file}.events"),
+            horizon=horizon,
+            lock_file=f"{cache_file}.lock",
+            ttl_bounds=config.get("adaptive_ttl"),
+        )
+
+    @staticmethod
+    def _key(files: Dict[str, List[int]]) -> str:
+        return hashlib.sha1(json.dumps(files, sort_keys=True).encode()).hexdigest()
+
+    def _cache_key(self) -> str:
+        return self._key(self.service.fingerprint())
+
+    def _refresh_events(self, cached: List[IcsEvent]) -> Iterable[Event]:
+        files = self.service.fingerprint()
+        metadata = self.cache_manager.metadata
+        reusable: Dict[str, List[int]] = {}
+
+        # Events read within the last ttl still cover the current window, so
+        # only files whose mtime or size changed are parsed again.
+        if arrow.now().timestamp() - metadata.get("load_time", 0) <= self.ttl:
+            reusable = metadata.get("files", {})
+
+        events = [e for e in cached if reusable.get(e["file"]) == files.get(e["file"])]
+
+        for path in files:
+            if reusable.get(path) != files[path]:
+                events.extend(self.service.read_file(path))
+
+        events.sort(key=lambda event: event["start"])
+        parsed = self._parse_events(events)
+        self._build_cache(
+            events,
+            parsed,
+            changed=files != metadata["files"] if "files" in metadata else None,
+            key=self._key(files),
+            files=files,
+        )
+
+        yield from parsed
+
+    def _parse_events(self, events: Iterable[IcsEvent]) -> List[Event]:
+        with span("parse", calendar=self.name):
+            events = list(events)
+            exceptions: Dict[str, List[str]] = {}
+
+            # Instances overridden by their own VEVENT are excluded from the
+            # series they were generated by.
+            for event in events:
+                if recurrence_id := event.get("recurrence_id"):
+                    exceptions.setdefault(event.get("id", ""), []).append(
+                        f"EXDATE:{recurrence_stamp(*recurrence_id)}"
+                    )
+
+            parsed = []
+
+            for event in events:
+                if event.get("status") == "CANCELLED":
+                    continue
+
+                parsed_event = self._parse_event(event)
+
+                if "rules" in event and "recurrence_id" not in event:
+                    rules = event["rules"] + exceptions.get(parsed_event.id, [])
+                    parsed_event = RecurringEvent.from_event(
+                        parsed_event, "\n".join(rules)
+                    )
+
+                parsed.append(parsed_event)
+
+            return parsed
+
+    def _parse_event(self, event: IcsEvent) -> Event:
+        event_id = event.get("id", f"{event['file']}:{event['start']}")
+
+        if recurrence_id := event.get("recurrence_id"):
+            event_id = f"{event_id}_{recurrence_stamp(*recurrence_id)}"
+
+        return Event.from_epochs(
+            id=event_id,
+            title=event.get("title", "(no title)"),
+            start=event["start"],
+            end=event["end"],
+            tz=event["tz"],
+            location=event.get("location", "-"),
+            going=STATUSES.get(event.get("status", "CONFIRMED"), EventStatus.ACCEPTED),
+            type="-",
+            video_link=event.get("url"),
+            calendar=self.name,
+        )
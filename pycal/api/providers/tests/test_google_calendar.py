@@ -1,12 +1,21 @@
+from contextlib import nullcontext
+from datetime import datetime, timezone
+import threading
+import time
 from typing import TYPE_CHECKING
 import arrow
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpMockSequence
 from mock.mock import Mock, PropertyMock, mock_open, patch
+import pytest
 
-from pycal.api import EventStatus
+from pycal.api import EventStatus, RecurringEvent
 from pycal.api.providers.google_calendar import (
     GoogleCalendar,
     GoogleCalendarAPI,
     GoogleCredentials,
+    HttpPool,
+    SyncTokenExpired,
 )
 
 
@@ -40,7 +49,68 @@ m_event: "GoogleEvent" = {
 # m_event = cast(GoogleEvent, m_event)
 
 
+def synced(events, sync_token):
+    yield from events
+    return sync_token
+
+
+m_batch = """--b
+Content-Type: application/http
+Content-ID: <response-pycal + 1>
+
+HTTP/1.1 200 OK
+Content-Type: application/json
+
+{"items": [2], "nextSyncToken": "b-next"}
+--b
+Content-Type: application/http
+Content-ID: <response-pycal + 0>
+
+HTTP/1.1 410 Gone
+Content-Type: application/json
+
+{"error": {"code": 410, "message": "Sync token is no longer valid"}}
+--b--
+""".replace(
+    "\n", "\r\n"
+)
+
+
 class TestGoogleCalendar:
+    def test_parse_cancelled_google_event(self):
+        # arrange
+        calendar = GoogleCalendar(
+            name="Test Calendar", service=Mock(), cache_manager=Mock()
+        )
+        cancelled = {
+            "id": "abc123_20220407T150000Z",
+            "status": "cancelled",
+            "recurringEventId": "abc123",
+            "originalStartTime": {"dateTime": "2022-04-07T17:00:00+02:00"},
+        }
+
+        # act
+        event = calendar._parse_event(cancelled)
+
+        # assert
+        assert event is None
+
+    def test_event_key_flags_series_rows(self):
+        # arrange
+        series = dict(m_event, recurrence=["RRULE:FREQ=DAILY"])
+        instance = {
+            "id": "abc123_20220407T150000Z",
+            "status": "cancelled",
+            "recurringEventId": "abc123",
+            "originalStartTime": {"dateTime": "2022-04-07T17:00:00+02:00"},
+        }
+
+        # act
+        flags = [GoogleCalendar._event_key(e)[3] for e in (m_event, series, instance)]
+
+        # assert
+        assert flags == [False, True, True]
+
     def test_parse_google_event(self):
         # arrange
         calendar = GoogleCalendar(
@@ -51,6 +121,7 @@ class TestGoogleCalendar:
         event = calendar._parse_event(m_event)
 
         # assert
+        assert event is not None
         assert event.id == "abc123"
         assert event.title == "Test Event"
         assert event.start_time == arrow.get("2022-04-06 17:00:00")
@@ -61,10 +132,215 @@ class TestGoogleCalendar:
         assert event.video_link == "http://meet.google.com/meeting"
         assert event.calendar == "Test Calendar"
 
+    def test_parse_google_events_batch(self):
+        # arrange
+        calendar = GoogleCalendar(
+            name="Test Calendar", service=Mock(), cache_manager=Mock()
+        )
+        offset = dict(m_event, id="def456", conferenceData={})
+        offset["start"] = {"dateTime": "2022-04-06T17:00:00+02:00"}
+        offset["end"] = {"dateTime": "2022-04-06T18:00:00Z"}
+        all_day = dict(m_event, id="ghi789", attendees=[])
+        all_day["start"] = {"date": "2022-04-06"}
+        all_day["end"] = {"date": "2022-04-07"}
+
+        # act
+        events = calendar._parse_events([offset, all_day])
+
+        # assert
+        assert events[0].start_time == arrow.get("2022-04-06T15:00:00Z")
+        assert events[0].end_time == arrow.get("2022-04-06T18:00:00Z")
+        assert events[0].tz == "+02:00"
+        assert events[0].type == "-"
+        assert events[1].start_time == arrow.get("2022-04-06", tzinfo="local")
+        assert events[1].end_time == arrow.get("2022-04-07", tzinfo="local")
+        assert events[1].going == EventStatus.NOT_ANSWERED
+
+    def test_parse_google_series_with_exceptions(self):
+        # arrange
+        calendar = GoogleCalendar(
+            name="Test Calendar", service=Mock(), cache_manager=Mock()
+        )
+        series = dict(m_event, recurrence=["RRULE:FREQ=DAILY"])
+        series["start"] = {
+            "dateTime": "2022-04-06T17:00:00+02:00",
+            "timeZone": "Europe/Madrid",
+        }
+        series["end"] = {"dateTime": "2022-04-06T18:00:00+02:00"}
+        moved = dict(
+            series,
+            id="abc123_20220407T150000Z",
+            recurringEventId="abc123",
+            originalStartTime={"dateTime": "2022-04-07T17:00:00+02:00"},
+        )
+        del moved["recurrence"]
+        cancelled = {
+            "id": "abc123_20220408T150000Z",
+            "status": "cancelled",
+            "recurringEventId": "abc123",
+            "originalStartTime": {"dateTime": "2022-04-08T15:00:00Z"},
+        }
+
+        # act
+        events = calendar._parse_events([series, moved, cancelled])
+
+        # assert
+        assert [event.id for event in events] == ["abc123", "abc123_20220407T150000Z"]
+        assert isinstance(events[0], RecurringEvent)
+        assert events[0].tz == "Europe/Madrid"
+        assert events[0].rule.splitlines() == [
+            "RRULE:FREQ=DAILY",
+            "EXDATE:20220407T150000Z",
+            "EXDATE:20220408T150000Z",
+        ]
+
+    @patch("pycal.api.providers.google_calendar.arrow.now")
+    def test_refresh_events_merges_changes(self, m_now):
+        # arrange
+        m_now.return_value = arrow.get("2022-04-06T00:00:00")
+        changed = dict(m_event, summary="Changed Event")
+        added = dict(m_event, id="def456")
+        added["start"] = {"dateTime": "2022-04-06T09:00:00"}
+        cancelled = {"id": "ghi789", "status": "cancelled"}
+        cached = [m_event, dict(m_event, id="ghi789")]
+
+        m_cache = Mock(metadata={"key": "2", "sync_token": "token"})
+        m_service = Mock()
+        m_service.sync_events.return_value = synced([changed, added, cancelled], "next")
+        calendar = GoogleCalendar(
+            name="Test Calendar", service=m_service, cache_manager=m_cache
+        )
+
+        # act
+        events = list(calendar._refresh_events(cached))
+
+        # assert
+        m_service.sync_events.assert_called_once_with("token")
+        assert [e.id for e in events] == ["def456", "abc123"]
+        assert events[1].title == "Changed Event"
+        m_cache.build_cache.assert_called_once_with(
+            [added, changed], key="2", sync_token="next"
+        )
+
+    def test_refresh_events_full_sync_when_token_expired(self):
+        # arrange
+        m_cache = Mock(metadata={"key": "2", "sync_token": "expired"})
+        m_service = Mock()
+        m_service.sync_events.side_effect = [SyncTokenExpired(), synced([], "fresh")]
+        calendar = GoogleCalendar(
+            name="Test Calendar", service=m_service, cache_manager=m_cache
+        )
+
+        # act
+        events = list(calendar._refresh_events([m_event]))
+
+        # assert
+        assert events == []
+        m_service.sync_events.assert_called_with()
+        m_cache.build_cache.assert_called_once_with([], key="2", sync_token="fresh")
+
+    def test_refresh_events_keeps_cache_when_full_sync_fails(self):
+        # arrange
+        m_cache = Mock(metadata={"key": "2", "sync_token": "expired"})
+        m_service = Mock()
+        m_service.sync_events.side_effect = [
+            SyncTokenExpired(),
+            HttpError(Mock(status=503), b""),
+        ]
+        calendar = GoogleCalendar(
+            name="Test Calendar", service=m_service, cache_manager=m_cache
+        )
+
+        # act
+        events = list(calendar._refresh_events([m_event]))
+
+        # assert
+        assert [event.id for event in events] == ["abc123"]
+        m_cache.build_cache.assert_not_called()
+
+    def test_refresh_events_full_sync_for_older_cache_format(self):
+        # arrange
+        m_cache = Mock(metadata={"sync_token": "instances-token"})
+        m_service = Mock()
+        m_service.sync_events.return_value = synced([], "fresh")
+        calendar = GoogleCalendar(
+            name="Test Calendar", service=m_service, cache_manager=m_cache
+        )
+
+        # act
+        events = list(calendar._refresh_events([m_event]))
+
+        # assert
+        assert events == []
+        m_service.sync_events.assert_called_once_with(None)
+        m_cache.build_cache.assert_called_once_with([], key="2", sync_token="fresh")
+
+    @patch("pycal.api.providers.google_calendar.arrow.now")
+    @patch.object(GoogleCalendarAPI, "sync_batch")
+    def test_prefetch_syncs_calendars_in_one_batch(self, m_sync_batch, m_now):
+        # arrange
+        m_now.return_value = arrow.get("2022-04-06T00:00:00")
+        calendars = [
+            GoogleCalendar(
+                name=name,
+                service=Mock(),
+                cache_manager=Mock(
+                    metadata={"key": "2", "sync_token": f"{name}-token"}
+                ),
+            )
+            for name in ("Work", "Team")
+        ]
+
+        for calendar in calendars:
+            calendar.cache_manager.load_cache.return_value = ([], False)
+
+        work, team = calendars
+        m_sync_batch.return_value = {
+            work.service: ([m_event], "work-next"),
+            team.service: SyncTokenExpired(),
+        }
+        team.service.sync_events.return_value = synced([], "team-fresh")
+
+        # act
+        GoogleCalendar.prefetch(calendars, ignore_cache=False)
+        work_events = list(work._refresh_events([]))
+        team_events = list(team._refresh_events([]))
+
+        # assert
+        m_sync_batch.assert_called_once_with(
+            {work.service: "Work-token", team.service: "Team-token"}
+        )
+        assert [event.id for event in work_events] == ["abc123"]
+        work.service.sync_events.assert_not_called()
+        work.cache_manager.build_cache.assert_called_once_with(
+            [m_event], key="2", sync_token="work-next"
+        )
+        assert team_events == []
+        team.service.sync_events.assert_called_once_with()
+
+    @patch("os.path.exists", Mock(side_effect=lambda path: path == "work.token.json"))
+    @patch.object(GoogleCredentials, "get_authorization")
+    def test_authorize_asks_consent_only_for_new_accounts(self, m_get_authorization):
+        # arrange
+        calendars = [
+            GoogleCalendar(
+                name=name,
+                service=GoogleCalendarAPI(f"{name}.json"),
+                cache_manager=Mock(),
+            )
+            for name in ("work", "home")
+        ]
+
+        # act
+        GoogleCalendar.authorize(calendars)
+
+        # assert
+        m_get_authorization.assert_called_once_with()
+
 
 class TestGoogleCredentials:
     @patch("os.path.exists", Mock(return_value=True))
-    @patch("pycal.api.providers.google_calendar.Credentials")
+    @patch("google.oauth2.credentials.Credentials")
     def test_authorize_from_token(self, m_credentials):
         # arrange
         m_authorization = Mock(expired=False)
@@ -78,7 +354,8 @@ class TestGoogleCredentials:
         assert authorization is m_authorization
 
     @patch("os.path.exists", Mock(return_value=True))
-    @patch("pycal.api.providers.google_calendar.Credentials")
+    @patch("google.oauth2.credentials.Credentials")
+    @patch("pycal.api.providers.google_calendar.os.replace", Mock())
     @patch("pycal.api.providers.google_calendar.open", new_callable=mock_open)
     def test_authorize_from_expired_token(self, m_open, m_credentials):
         # arrange
@@ -96,7 +373,8 @@ class TestGoogleCredentials:
         m_open.return_value.write.assert_called_once_with(m_authorization.to_json())
 
     @patch("os.path.exists", Mock(return_value=False))
-    @patch("pycal.api.providers.google_calendar.InstalledAppFlow")
+    @patch("google_auth_oauthlib.flow.InstalledAppFlow")
+    @patch("pycal.api.providers.google_calendar.os.replace", Mock())
     @patch("pycal.api.providers.google_calendar.open", new_callable=mock_open)
     def test_authorize_from_credentials(self, m_open, m_appflow):
         # arrange
@@ -113,18 +391,193 @@ class TestGoogleCredentials:
         assert authorization is m_authorization
         m_open.return_value.write.assert_called_once_with(m_authorization.to_json())
 
+    def test_for_file_shares_credentials(self):
+        # act
+        credentials = [GoogleCredentials.for_file(f) for f in ("a.json", "a.json")]
+
+        # assert
+        assert credentials[0] is credentials[1]
+        assert GoogleCredentials.for_file("b.json") is not credentials[0]
+
+    def test_get_authorization_refreshes_once_across_threads(self):
+        # arrange
+        credentials = GoogleCredentials("foobar.json")
+        started = threading.Barrier(4)
+
+        def authorize() -> bool:
+            time.sleep(0.05)
+            credentials._authorization = Mock(valid=True)
+            return True
+
+        def get_authorization() -> None:
+            started.wait()
+            credentials.get_authorization()
+
+        threads = [threading.Thread(target=get_authorization) for _ in range(4)]
+
+        # act
+        with patch.object(credentials, "_authorize_from_token") as m_authorize:
+            m_authorize.side_effect = authorize
+
+            for thread in threads:
+                thread.start()
+
+            for thread in threads:
+                thread.join()
+
+        # assert
+        m_authorize.assert_called_once()
+
+
+class TestHttpPool:
+    def test_connection_is_reused(self):
+        # arrange
+        pool = HttpPool()
+
+        # act
+        with pool.connection() as first:
+            with pool.connection() as second:
+                pass
+
+        with pool.connection() as third:
+            pass
+
+        # assert
+        assert first is not second
+        assert third in (first, second)
+
 
 class TestGoogleCalendarAPI:
+    @patch.object(GoogleCalendarAPI, "authorized_http")
     @patch.object(GoogleCalendarAPI, "service", new_callable=PropertyMock)
-    def test_get_google_events(self, m_service):
+    def test_get_events_streams_pages_of_window(self, m_service, m_http):
         # arrange
-        m_service.return_value.list.return_value.execute.return_value = {
-            "items": [1, 2, 3]
-        }
+        m_list = m_service.return_value.list
+        m_list.return_value.execute.side_effect = [
+            {"items": [1, 2], "nextPageToken": "page-2"},
+            {"items": [3]},
+        ]
+        google_api = GoogleCalendarAPI("foobar.json")
+        time_min = datetime(2022, 4, 6, tzinfo=timezone.utc)
+        time_max = datetime(2022, 4, 7, tzinfo=timezone.utc)
+
+        # act
+        events = google_api.get_events(time_min, time_max)
+        first = next(events)
+        pages_before_rest = m_list.return_value.execute.call_count
+        rest = list(events)
+
+        # assert
+        assert (first, rest) == (1, [2, 3])
+        assert pages_before_rest == 1
+        params = m_list.call_args_list[0].kwargs
+        assert params["timeMin"] == "2022-04-06T00:00:00+00:00"
+        assert params["timeMax"] == "2022-04-07T00:00:00+00:00"
+        assert params["singleEvents"] is True
+        assert params["orderBy"] == "startTime"
+        assert m_list.call_args_list[1].kwargs["pageToken"] == "page-2"
+
+    @patch.object(GoogleCalendarAPI, "authorized_http")
+    @patch.object(GoogleCalendarAPI, "service", new_callable=PropertyMock)
+    def test_sync_events_with_token(self, m_service, m_http):
+        # arrange
+        m_list = m_service.return_value.list
+        m_list.return_value.execute.side_effect = [
+            {"items": [1], "nextPageToken": "page-2"},
+            {"items": [2], "nextSyncToken": "next"},
+        ]
 
         # act
         google_api = GoogleCalendarAPI("foobar.json")
-        events = google_api.get_events()
+        stream = google_api.sync_events("token")
+        first = next(stream)
+        pages_before_rest = m_list.return_value.execute.call_count
+        second = next(stream)
+
+        with pytest.raises(StopIteration) as stop:
+            next(stream)
 
         # assert
-        assert events == [1, 2, 3]
+        assert (first, second) == (1, 2)
+        assert pages_before_rest == 1
+        assert stop.value.value == "next"
+        assert m_list.call_args.kwargs["syncToken"] == "token"
+        assert "timeMin" not in m_list.call_args.kwargs
+        m_list.return_value.execute.assert_called_with(
+            http=m_http.return_value.__enter__.return_value
+        )
+
+    @patch.object(GoogleCalendarAPI, "service", new_callable=PropertyMock)
+    @patch.object(GoogleCalendarAPI, "batch", autospec=True)
+    def test_sync_batch_groups_calendars_by_account(self, m_batch, m_service):
+        # arrange
+        work = GoogleCalendarAPI("account.json", "work@example.com")
+        team = GoogleCalendarAPI("account.json", "team@example.com")
+        other = GoogleCalendarAPI("other.json")
+        m_batch.side_effect = [
+            [
+                ({"items": [1], "nextPageToken": "page-2"}, None),
+                ({"items": [2], "nextSyncToken": "team-next"}, None),
+            ],
+            [({"items": [3], "nextSyncToken": "work-next"}, None)],
+        ]
+
+        # act
+        results = GoogleCalendarAPI.sync_batch(
+            {work: "work-token", team: None, other: "other-token"}
+        )
+
+        # assert
+        assert results == {work: ([1, 3], "work-next"), team: ([2], "team-next")}
+        assert m_batch.call_count == 2
+        calls = m_service.return_value.list.call_args_list
+        assert [c.kwargs["calendarId"] for c in calls] == [
+            "work@example.com",
+            "team@example.com",
+            "work@example.com",
+        ]
+        assert calls[0].kwargs["syncToken"] == "work-token"
+        assert "timeMin" in calls[1].kwargs
+        assert calls[2].kwargs["pageToken"] == "page-2"
+
+    def test_batch_splits_multipart_response(self):
+        # arrange
+        google_api = GoogleCalendarAPI("account.json", "work@example.com")
+        headers = {"status": "200", "content-type": "multipart/mixed; boundary=b"}
+        http = HttpMockSequence([(headers, m_batch)])
+        google_api.authorized_http = Mock(return_value=nullcontext(http))
+        requests = [
+            google_api.service.list(calendarId=calendar_id) for calendar_id in "ab"
+        ]
+
+        # act
+        (_, error), (events, _) = google_api.batch(requests)
+
+        # assert
+        assert error.resp.status == 410
+        assert events == {"items": [2], "nextSyncToken": "b-next"}
+
+    @patch.object(GoogleCalendarAPI, "_root", None)
+    @patch.object(GoogleCalendarAPI, "_service", None)
+    @patch("googleapiclient.discovery.build_from_document")
+    def test_service_is_shared_between_calendars(self, m_build):
+        # act
+        services = [GoogleCalendarAPI(f"{name}.json").service for name in "ab"]
+
+        # assert
+        assert services[0] is services[1]
+        m_build.assert_called_once()
+
+    @patch.object(GoogleCalendarAPI, "authorized_http")
+    @patch.object(GoogleCalendarAPI, "service", new_callable=PropertyMock)
+    def test_sync_events_gone(self, m_service, m_http):
+        # arrange
+        m_service.return_value.list.return_value.execute.side_effect = HttpError(
+            Mock(status=410), b""
+        )
+
+        # act/assert
+        google_api = GoogleCalendarAPI("foobar.json")
+
+        with pytest.raises(SyncTokenExpired):
+            list(google_api.sync_events("token"))
@@ -0,0 +1,209 @@
+import os
+
+import arrow
+from mock import Mock, patch
+import pytest
+
+from pycal.api import EventCache, EventStatus, JsonCacheManager
+from pycal.api.providers.ics_calendar import (
+    IcsCalendar,
+    IcsCalendarAPI,
+    parse_line,
+    read_events,
+)
+
+
+m_calendar = """BEGIN:VCALENDAR\r
+VERSION:2.0\r
+BEGIN:VEVENT\r
+UID:standup\r
+SUMMARY:Daily standup\\, team\r
+DTSTART;TZID=Europe/Madrid:20220406T090000\r
+DTEND;TZID=Europe/Madrid:20220406T091500\r
+LOCATION:Room 1\r
+URL:https://meet.example.com/st\r
+ andup\r
+BEGIN:VALARM\r
+TRIGGER:-PT10M\r
+SUMMARY:Alarm\r
+END:VALARM\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:holiday\r
+SUMMARY:Holiday\r
+DTSTART;VALUE=DATE:20220407\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:review\r
+SUMMARY:Review\r
+STATUS:TENTATIVE\r
+DTSTART:20220406T150000Z\r
+DURATION:PT1H30M\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:cancelled\r
+STATUS:CANCELLED\r
+DTSTART:20220406T160000Z\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:past\r
+DTSTART:20220401T100000Z\r
+DTEND:20220401T110000Z\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:future\r
+DTSTART:20230401T100000Z\r
+DTEND:20230401T110000Z\r
+END:VEVENT\r
+END:VCALENDAR\r
+"""
+
+m_series = """BEGIN:VCALENDAR\r
+BEGIN:VEVENT\r
+UID:weekly\r
+SUMMARY:Weekly sync\r
+DTSTART;TZID=Europe/Madrid:20220302T090000\r
+DTEND;TZID=Europe/Madrid:20220302T100000\r
+RRULE:FREQ=WEEKLY;UNTIL=20220430T000000Z\r
+EXDATE;TZID=Europe/Madrid:20220420T090000\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:weekly\r
+STATUS:CANCELLED\r
+RECURRENCE-ID;TZID=Europe/Madrid:20220427T090000\r
+DTSTART;TZID=Europe/Madrid:20220427T090000\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:weekly\r
+RECURRENCE-ID;TZID=Europe/Madrid:20220413T090000\r
+SUMMARY:Weekly sync (moved)\r
+DTSTART;TZID=Europe/Madrid:20220413T110000\r
+DTEND;TZID=Europe/Madrid:20220413T120000\r
+END:VEVENT\r
+END:VCALENDAR\r
+"""
+
+TIME_MIN = arrow.get("2022-04-06T00:00:00Z").timestamp()
+TIME_MAX = arrow.get("2022-05-06T00:00:00Z").timestamp()
+
+
+class TestIcsParser:
+    def test_parse_line_with_quoted_params(self):
+        # act
+        line = parse_line(
+            'DTSTART;TZID="Europe/Madrid";VALUE=DATE-TIME:20220406T170000'
+        )
+
+        # assert
+        assert line == (
+            "DTSTART",
+            {"TZID": "Europe/Madrid", "VALUE": "DATE-TIME"},
+            "20220406T170000",
+        )
+
+    def test_read_events(self):
+        # act
+        events = list(
+            read_events(m_calendar.splitlines(True), TIME_MIN, TIME_MAX, "cal.ics")
+        )
+
+        # assert
+        assert [event["id"] for event in events] == ["standup", "holiday", "review"]
+        assert events[0]["title"] == "Daily standup, team"
+        assert events[0]["url"] == "https://meet.example.com/standup"
+        assert events[0]["start"] == arrow.get("2022-04-06T07:00:00Z").timestamp()
+        assert events[0]["tz"] == "Europe/Madrid"
+        assert events[1]["end"] - events[1]["start"] == 86400
+        assert events[1]["tz"] == "local"
+        assert events[2]["end"] - events[2]["start"] == 5400
+        assert events[2]["file"] == "cal.ics"
+
+
+class TestIcsCalendar:
+    @staticmethod
+    def _calendar(tmp_path) -> IcsCalendar:
+        return IcsCalendar(
+            "Team",
+            service=IcsCalendarAPI(str(tmp_path / "calendars")),
+            cache_manager=JsonCacheManager(str(tmp_path / "team.json")),
+            ttl=86400,
+            event_cache=EventCache(str(tmp_path / "team.events")),
+        )
+
+    @patch("pycal.api.providers.ics_calendar.arrow.now")
+    def test_get_events_merges_files_in_start_order(self, m_now, tmp_path):
+        # arrange
+        m_now.return_value = arrow.get(TIME_MIN)
+        (tmp_path / "calendars").mkdir()
+        (tmp_path / "calendars" / "team.ics").write_text(m_calendar)
+        (tmp_path / "calendars" / "other.ics").write_text(
+            m_calendar.replace("UID:", "UID:other-").replace("T09", "T12")
+        )
+
+        # act
+        events = list(self._calendar(tmp_path).get_events())
+
+        # assert
+        assert [event.id for event in events][:2] == ["standup", "other-standup"]
+        assert {e.going for e in events if e.id.endswith("review")} == {
+            EventStatus.NOT_ANSWERED
+        }
+        assert events == sorted(events, key=lambda event: event.start)
+
+    @patch("pycal.api.providers.ics_calendar.arrow.now")
+    def test_get_events_rereads_only_changed_files(self, m_now, tmp_path):
+        # arrange
+        m_now.return_value = arrow.get(TIME_MIN)
+        (tmp_path / "calendars").mkdir()
+        team = tmp_path / "calendars" / "team.ics"
+        other = tmp_path / "calendars" / "other.ics"
+        team.write_text(m_calendar)
+        other.write_text(m_calendar.replace("UID:", "UID:other-"))
+        list(self._calendar(tmp_path).get_events())
+
+        team.write_text(m_calendar.replace("Daily standup", "Standup"))
+        os.utime(team, ns=(0, 0))
+        calendar = self._calendar(tmp_path)
+        calendar.service.read_file = Mock(wraps=calendar.service.read_file)
+
+        # act
+        events = list(calendar.get_events())
+
+        # assert
+        calendar.service.read_file.assert_called_once_with(str(team))
+        assert {e.title for e in events if e.id.endswith("standup")} == {
+            "Standup, team",
+            "Daily standup, team",
+        }
+
+    @patch("pycal.api.Arrow.now")
+    @patch("pycal.api.providers.ics_calendar.arrow.now")
+    def test_get_events_expands_series(self, m_now, m_api_now, tmp_path):
+        # arrange
+        m_now.return_value = m_api_now.return_value = arrow.get(TIME_MIN)
+        (tmp_path / "calendars").mkdir()
+        (tmp_path / "calendars" / "team.ics").write_text(m_series)
+
+        # act
+        events = list(self._calendar(tmp_path).get_events())
+
+        # assert
+        assert [(e.id, e.start_time.format("MM-DD HH:mm")) for e in events] == [
+            ("weekly_20220406T070000Z", "04-06 09:00"),
+            ("weekly_20220413T070000Z", "04-13 11:00"),
+        ]
+
+    @pytest.mark.parametrize("path", ["calendars/team.ics", "calendars"])
+    def test_cache_key_follows_files(self, tmp_path, path: str):
+        # arrange
+        (tmp_path / "calendars").mkdir()
+        (tmp_path / "calendars" / "team.ics").write_text(m_calendar)
+        calendar = self._calendar(tmp_path)
+        calendar.service.path = str(tmp_path / path)
+        key = calendar._cache_key()
+
+        # act
+        (tmp_path / "calendars" / "team.ics").write_text(m_calendar + "\r\n")
+
+        # assert
+        assert calendar._cache_key() != key
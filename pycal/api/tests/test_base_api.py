@@ -1,12 +1,85 @@
 import json
+import random
+import sqlite3
+import subprocess
+import threading
+import time
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import arrow
 from mock import patch, mock_open, Mock
 
 import pytest
 
-from pycal.api import BaseCalendar, Event, EventStatus, EventStorage, JsonCacheManager
+from pycal import tracing
+from pycal.api import (
+    BaseCalendar,
+    Event,
+    EventCache,
+    EventIndex,
+    EventStatus,
+    EventStorage,
+    JsonCacheManager,
+    RecurringEvent,
+    SqliteCacheManager,
+    expand_recurrences,
+    file_lock,
+)
+
+
+class TestEvent:
+    def test_event_stores_epochs(self):
+        # arrange
+        start = arrow.get("2022-04-06T17:00:00+02:00")
+
+        # act
+        event = Event(
+            id="1",
+            title="some event",
+            start_time=start,
+            end_time=start.shift(hours=1),
+            going=EventStatus.ACCEPTED,
+            location="",
+            type="",
+            video_link=None,
+            calendar="Mock Calendar",
+        )
+
+        # assert
+        assert not hasattr(event, "__dict__")
+        assert (event.start, event.end, event.tz) == (1649257200, 1649260800, "+02:00")
+        assert event.start_time == start
+        assert event.start_time.utcoffset() == start.utcoffset()
+
+    def test_event_from_epochs(self):
+        # act
+        event = Event.from_epochs(
+            id="1",
+            title="some event",
+            start=1649257200,
+            end=1649260800,
+            tz="Europe/Madrid",
+            going=EventStatus.ACCEPTED,
+            location="",
+            type="",
+            video_link=None,
+            calendar="Mock Calendar",
+        )
+
+        # assert
+        assert event.start_time.format("YYYY-MM-DD HH:mm") == "2022-04-06 17:00"
+        assert event.end_time.format("YYYY-MM-DD HH:mm") == "2022-04-06 18:00"
+        assert event == Event(
+            id="1",
+            title="some event",
+            start_time=event.start_time,
+            end_time=event.end_time,
+            going=EventStatus.ACCEPTED,
+            location="",
+            type="",
+            video_link=None,
+            calendar="Mock Calendar",
+        )
 
 
 class TestJsonCacheManager:
@@ -42,8 +115,10 @@ class TestJsonCacheManager:
             assert is_valid == expect_valid
 
     @patch("pycal.api.Arrow.now", Mock(return_value=arrow.get("1970-01-01")))
+    @patch("pycal.api.os.getpid", Mock(return_value=42))
+    @patch("pycal.api.os.replace")
     @patch("pycal.api.json.dump")
-    def test_build_cache(self, m_dump):
+    def test_build_cache(self, m_dump, m_replace):
         # arrange
         cache_manager = JsonCacheManager(cache_file="cache.json")
 
@@ -52,9 +127,790 @@ class TestJsonCacheManager:
             cache_manager.build_cache([{"event": "data"}])
 
             # assert
+            m_open.assert_called_once_with("cache.json.42.tmp", "w")
             m_dump.assert_called_with(
                 {"events": [{"event": "data"}], "load_time": 0.0}, m_open.return_value
             )
+            m_replace.assert_called_once_with("cache.json.42.tmp", "cache.json")
+
+    @patch("os.path.exists", Mock(return_value=True))
+    def test_load_cache_metadata(self):
+        # arrange
+        m_data = {"load_time": 0.0, "events": [], "sync_token": "token"}
+
+        with patch("pycal.api.open", mock_open(read_data=json.dumps(m_data))):
+            cache_manager = JsonCacheManager(cache_file="cache.json")
+
+            # act
+            cache_manager.load_cache()
+
+            # assert
+            assert cache_manager.metadata == {"load_time": 0.0, "sync_token": "token"}
+
+
+class TestSqliteCacheManager:
+    @staticmethod
+    def _cache_manager(tmp_path, calendar: str = "Test") -> SqliteCacheManager:
+        return SqliteCacheManager(
+            cache_file=str(tmp_path / "cache.db"),
+            calendar=calendar,
+            event_key=lambda e: (e["id"], e["start"], e["end"], "rule" in e),
+        )
+
+    def test_load_cache_from_empty_database_returns_no_events(self, tmp_path):
+        # arrange
+        cache_manager = self._cache_manager(tmp_path)
+
+        # act
+        cache, is_valid = cache_manager.load_cache()
+
+        # assert
+        assert cache == []
+        assert not is_valid
+
+    def test_build_and_load_cache(self, tmp_path):
+        # arrange
+        cache_manager = self._cache_manager(tmp_path)
+        other_manager = self._cache_manager(tmp_path, calendar="Other")
+        events = [
+            {"id": "b", "start": 20, "end": 30},
+            {"id": "a", "start": 10, "end": 20},
+        ]
+
+        # act
+        cache_manager.build_cache(events, sync_token="token")
+        other_manager.build_cache([{"id": "c", "start": 0, "end": 5}])
+        cache, is_valid = cache_manager.load_cache()
+
+        # assert
+        assert cache == [events[1], events[0]]
+        assert is_valid
+        assert cache_manager.metadata["sync_token"] == "token"
+        assert "load_time" in cache_manager.metadata
+
+    def test_build_cache_replaces_events(self, tmp_path):
+        # arrange
+        cache_manager = self._cache_manager(tmp_path)
+        cache_manager.build_cache(
+            [{"id": "a", "start": 10, "end": 20}, {"id": "b", "start": 20, "end": 30}]
+        )
+
+        # act
+        cache_manager.build_cache([{"id": "a", "start": 15, "end": 20}])
+        cache, _ = cache_manager.load_cache()
+
+        # assert
+        assert cache == [{"id": "a", "start": 15, "end": 20}]
+
+    def test_load_range_keeps_series(self, tmp_path):
+        # arrange
+        cache_manager = self._cache_manager(tmp_path)
+        events = [
+            {"id": "s", "start": 0, "end": 5, "rule": "RRULE:FREQ=DAILY"},
+            {"id": "a", "start": 10, "end": 20},
+            {"id": "b", "start": 20, "end": 30},
+            {"id": "c", "start": 30, "end": 40},
+        ]
+        cache_manager.build_cache(events)
+
+        # act
+        cache = cache_manager.load_range(15, 25)
+
+        # assert
+        assert cache == events[:3]
+
+    def test_load_cache_since(self, tmp_path):
+        # arrange
+        cache_manager = self._cache_manager(tmp_path)
+        events = [
+            {"id": "s", "start": 0, "end": 5, "rule": "RRULE:FREQ=DAILY"},
+            {"id": "a", "start": 10, "end": 20},
+            {"id": "b", "start": 20, "end": 30},
+        ]
+        cache_manager.build_cache(events, sync_token="token")
+
+        # act
+        cache, is_valid = cache_manager.load_cache(since=25)
+
+        # assert
+        assert cache == [events[0], events[2]]
+        assert is_valid
+        assert cache_manager.metadata["sync_token"] == "token"
+
+    def test_drops_cache_of_older_schema(self, tmp_path):
+        # arrange
+        cache_file = tmp_path / "cache.db"
+
+        with sqlite3.connect(str(cache_file)) as connection:
+            connection.executescript(
+                "CREATE TABLE events (calendar TEXT, id TEXT, start_time REAL, "
+                "end_time REAL, payload TEXT);"
+            )
+
+        cache_manager = self._cache_manager(tmp_path)
+
+        # act
+        cache_manager.build_cache([{"id": "a", "start": 10, "end": 20}])
+        cache, _ = cache_manager.load_cache()
+
+        # assert
+        assert cache == [{"id": "a", "start": 10, "end": 20}]
+
+
+class TestEventCache:
+    def test_build_and_load(self, tmp_path):
+        # arrange
+        cache = EventCache(str(tmp_path / "cache.events"))
+        events = [
+            make_event("b", "2022-04-06T10:00:00+02:00", "2022-04-06T11:00:00+02:00"),
+            make_event("a", "2022-04-06T09:00:00+02:00", "2022-04-06T10:00:00+02:00"),
+        ]
+        events[1].video_link = None
+
+        # act
+        cache.build(events)
+        records = cache.load()
+
+        # assert
+        assert records is not None
+        assert list(records) == [events[1], events[0]]
+        assert records[-1].start_time == arrow.get("2022-04-06T10:00:00+02:00")
+
+    def test_build_and_load_series(self, tmp_path):
+        # arrange
+        cache = EventCache(str(tmp_path / "cache.events"))
+        series = make_series(
+            "a", "2022-04-06 09:00", "2022-04-06 10:00", "RRULE:FREQ=DAILY"
+        )
+
+        # act
+        cache.build([series])
+        records = cache.load()
+
+        # assert
+        assert records is not None
+        assert isinstance(records[0], RecurringEvent)
+        assert records[0] == series
+
+    def test_since(self, tmp_path):
+        # arrange
+        cache = EventCache(str(tmp_path / "cache.events"))
+        cache.build(
+            [
+                make_series(
+                    "s", "2022-04-05 08:00", "2022-04-05 09:00", "RRULE:FREQ=DAILY"
+                ),
+                make_event("a", "2022-04-06 09:00", "2022-04-06 10:00"),
+                make_event("b", "2022-04-06 10:00", "2022-04-06 11:00"),
+                make_event("c", "2022-04-06 11:00", "2022-04-06 12:00"),
+            ]
+        )
+        records = cache.load()
+        assert records is not None
+
+        # act
+        events = records.since(arrow.get("2022-04-06 09:30").timestamp())
+
+        # assert
+        assert [event.id for event in events] == ["s", "b", "c"]
+
+    @pytest.mark.parametrize(
+        "header",
+        [
+            EventCache.HEADER.pack(b"PYCE", EventCache.VERSION + 1, 0, 0, 0, b"", 0),
+            b"PYCE",
+            b"",
+        ],
+    )
+    def test_load_rejects_unknown_files(self, tmp_path, header: bytes):
+        # arrange
+        cache_file = tmp_path / "cache.events"
+        cache_file.write_bytes(header)
+
+        # act
+        records = EventCache(str(cache_file)).load()
+
+        # assert
+        assert records is None
+
+    def test_load_with_other_key(self, tmp_path):
+        # arrange
+        cache = EventCache(str(tmp_path / "cache.events"))
+        cache.build([], key="a")
+
+        # act/assert
+        assert cache.load(key="a") is not None
+        assert cache.load(key="b") is None
+
+    @patch("pycal.api.Arrow.now", Mock(return_value=arrow.get(1000)))
+    def test_load_expired(self, tmp_path):
+        # arrange
+        cache = EventCache(str(tmp_path / "cache.events"))
+        cache.build([], load_time=500)
+
+        # act
+        records = cache.load(expiration=100)
+
+        # assert
+        assert records is None
+        assert cache.load_time == 500
+
+    @patch("pycal.api.Arrow.now", Mock(return_value=arrow.get(1000)))
+    def test_load_with_stored_ttl(self, tmp_path):
+        # arrange
+        cache = EventCache(str(tmp_path / "cache.events"))
+        cache.build([], load_time=500, ttl=600)
+
+        # act
+        records = cache.load(expiration=100)
+
+        # assert
+        assert records is not None
+
+
+def make_series(id: str, start: str, end: str, rule: str) -> RecurringEvent:
+    event = make_event(id, start, end)
+    event.tz = "Europe/Madrid"
+    return RecurringEvent.from_event(event, rule)
+
+
+class TestRecurringEvent:
+    def test_occurrences_keep_wall_clock_time_and_skip_exdates(self):
+        # arrange
+        series = make_series(
+            "standup",
+            "2022-03-25T09:00:00+01:00",
+            "2022-03-25T09:15:00+01:00",
+            "RRULE:FREQ=DAILY\nEXDATE;TZID=Europe/Madrid:20220328T090000",
+        )
+
+        # act
+        events = list(
+            series.occurrences(
+                arrow.get("2022-03-26T09:10:00+01:00").timestamp(),
+                arrow.get("2022-03-30T00:00:00+02:00").timestamp(),
+            )
+        )
+
+        # assert
+        assert [e.start_time.format("MM-DD HH:mm") for e in events] == [
+            "03-26 09:00",
+            "03-27 09:00",
+            "03-29 09:00",
+        ]
+        assert events[1].id == "standup_20220327T070000Z"
+        assert events[1].end - events[1].start == 900
+        assert not isinstance(events[0], RecurringEvent)
+
+    def test_expand_recurrences_in_start_order(self):
+        # arrange
+        events = [
+            make_series(
+                "daily",
+                "2022-04-01T09:00:00+02:00",
+                "2022-04-01T10:00:00+02:00",
+                "RRULE:FREQ=DAILY;COUNT=10",
+            ),
+            make_series(
+                "weekly",
+                "2022-04-06T11:00:00+02:00",
+                "2022-04-06T12:00:00+02:00",
+                "RRULE:FREQ=WEEKLY",
+            ),
+            make_event(
+                "lunch", "2022-04-06T12:00:00+02:00", "2022-04-06T13:00:00+02:00"
+            ),
+        ]
+
+        # act
+        expanded = expand_recurrences(
+            iter(events),
+            arrow.get("2022-04-06T00:00:00+02:00").timestamp(),
+            arrow.get("2022-04-08T00:00:00+02:00").timestamp(),
+        )
+
+        # assert
+        assert [event.id for event in expanded] == [
+            "daily_20220406T070000Z",
+            "weekly_20220406T090000Z",
+            "lunch",
+            "daily_20220407T070000Z",
+        ]
+
+
+class FakeCalendar(BaseCalendar[int]):
+    def _parse_event(self, event: int) -> int:
+        return event * 10
+
+
+class TestBaseCalendar:
+    def test_get_events_from_valid_cache(self):
+        # arrange
+        m_cache = Mock(metadata={})
+        m_cache.load_cache.return_value = ([1, 2], True)
+        calendar = FakeCalendar("Fake", cache_manager=m_cache, service=Mock())
+
+        # act
+        events = list(calendar.get_events())
+
+        # assert
+        assert events == [10, 20]
+        calendar.service.get_events.assert_not_called()
+
+    def test_get_events_from_event_cache(self):
+        # arrange
+        m_event_cache = Mock()
+        m_event_cache.load.return_value = [10, 20]
+        calendar = FakeCalendar(
+            "Fake", cache_manager=Mock(), service=Mock(), event_cache=m_event_cache
+        )
+
+        # act
+        events = list(calendar.get_events())
+
+        # assert
+        assert events == [10, 20]
+        calendar.cache_manager.load_cache.assert_not_called()
+
+    def test_get_events_since_reads_event_cache_from_timestamp(self):
+        # arrange
+        m_records = Mock()
+        m_records.since.return_value = iter([20])
+        m_event_cache = Mock()
+        m_event_cache.load.return_value = m_records
+        calendar = FakeCalendar(
+            "Fake", cache_manager=Mock(), service=Mock(), event_cache=m_event_cache
+        )
+
+        # act
+        events = list(calendar.get_events(since=1000))
+
+        # assert
+        assert events == [20]
+        m_records.since.assert_called_once_with(1000)
+
+    def test_get_events_since_reads_range_of_valid_cache(self):
+        # arrange
+        m_cache = Mock(metadata={})
+        m_cache.load_cache.return_value = ([2], True)
+        m_event_cache = Mock()
+        m_event_cache.load.return_value = None
+        calendar = FakeCalendar(
+            "Fake", cache_manager=m_cache, service=Mock(), event_cache=m_event_cache
+        )
+
+        # act
+        events = list(calendar.get_events(since=1000))
+
+        # assert
+        assert events == [20]
+        m_cache.load_cache.assert_called_once_with(600, 1000)
+        m_event_cache.build.assert_not_called()
+
+    def test_get_events_rebuilds_event_cache_from_valid_cache(self):
+        # arrange
+        m_cache = Mock(metadata={"load_time": 500})
+        m_cache.load_cache.return_value = ([1, 2], True)
+        m_event_cache = Mock()
+        m_event_cache.load.return_value = None
+        calendar = FakeCalendar(
+            "Fake", cache_manager=m_cache, service=Mock(), event_cache=m_event_cache
+        )
+
+        # act
+        events = list(calendar.get_events())
+
+        # assert
+        assert events == [10, 20]
+        m_event_cache.build.assert_called_once_with([10, 20], 500, "", 0)
+
+    def test_get_events_streams_from_service(self):
+        # arrange
+        m_cache = Mock(metadata={})
+        m_cache.load_cache.return_value = ([1], True)
+        m_service = Mock()
+        m_service.get_events.return_value = iter([1, 2, 3])
+        calendar = FakeCalendar("Fake", cache_manager=m_cache, service=m_service)
+
+        # act
+        events = calendar.get_events(ignore_cache=True)
+        first = next(events)
+
+        # assert
+        assert first == 10
+        m_cache.build_cache.assert_not_called()
+        assert list(events) == [20, 30]
+        m_cache.build_cache.assert_called_once_with([1, 2, 3])
+
+    @patch("pycal.api.Arrow.now", Mock(return_value=arrow.get(1000)))
+    def test_get_events_serves_stale_cache_while_revalidating(self):
+        # arrange
+        refreshed = threading.Event()
+        m_cache = Mock(metadata={"load_time": 500})
+        m_cache.load_cache.return_value = ([1, 2], False)
+        m_cache.build_cache.side_effect = lambda events: refreshed.set()
+        m_service = Mock()
+        m_service.get_events.return_value = iter([3])
+        calendar = FakeCalendar(
+            "Fake", cache_manager=m_cache, service=m_service, ttl=100, max_stale=600
+        )
+
+        # act
+        events = list(calendar.get_events())
+
+        # assert
+        assert events == [10, 20]
+        assert refreshed.wait(1)
+        m_cache.load_cache.assert_called_once_with(100, None)
+        m_cache.build_cache.assert_called_once_with([3])
+
+    @patch("pycal.api.subprocess.Popen")
+    @patch.object(FakeCalendar, "revalidate_command", ["pycal", "revalidate"])
+    @patch("pycal.api.Arrow.now", Mock(return_value=arrow.get(1000)))
+    def test_get_events_revalidates_in_detached_process(self, m_popen):
+        # arrange
+        m_popen.return_value.poll.return_value = None
+        m_cache = Mock(metadata={"load_time": 500})
+        m_cache.load_cache.return_value = ([1, 2], False)
+        m_service = Mock()
+        calendar = FakeCalendar(
+            "Fake", cache_manager=m_cache, service=m_service, ttl=100, max_stale=600
+        )
+
+        # act
+        events = list(calendar.get_events())
+        list(calendar.get_events())
+
+        # assert
+        assert events == [10, 20]
+        m_popen.assert_called_once_with(
+            ["pycal", "revalidate", "Fake"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        m_service.get_events.assert_not_called()
+
+    def test_revalidate_rebuilds_stale_cache(self):
+        # arrange
+        m_cache = Mock(metadata={"load_time": 500})
+        m_cache.load_cache.return_value = ([1, 2], False)
+        m_service = Mock()
+        m_service.get_events.return_value = iter([3])
+        calendar = FakeCalendar("Fake", cache_manager=m_cache, service=m_service)
+
+        # act
+        calendar.revalidate()
+
+        # assert
+        m_cache.build_cache.assert_called_once_with([3])
+
+    @patch("pycal.api.Arrow.now", Mock(return_value=arrow.get(1000)))
+    def test_get_events_blocks_past_max_stale(self):
+        # arrange
+        m_cache = Mock(metadata={"load_time": 100})
+        m_cache.load_cache.return_value = ([1, 2], False)
+        m_service = Mock()
+        m_service.get_events.return_value = iter([3])
+        calendar = FakeCalendar(
+            "Fake", cache_manager=m_cache, service=m_service, ttl=100, max_stale=600
+        )
+
+        # act
+        events = list(calendar.get_events())
+
+        # assert
+        assert events == [30]
+        assert calendar._revalidation is None
+
+    def test_get_events_reads_cache_refreshed_while_waiting(self, tmp_path):
+        # arrange
+        lock_file = str(tmp_path / "fake.lock")
+        held = threading.Event()
+        m_cache = Mock(metadata={})
+        m_cache.load_cache.side_effect = [([1], False), ([2], True)]
+        m_service = Mock()
+        calendar = FakeCalendar(
+            "Fake", cache_manager=m_cache, service=m_service, lock_file=lock_file
+        )
+
+        def refresh_elsewhere():
+            with file_lock(lock_file):
+                held.set()
+                time.sleep(0.1)
+
+        thread = threading.Thread(target=refresh_elsewhere)
+        thread.start()
+        held.wait(1)
+
+        # act
+        events = list(calendar.get_events())
+        thread.join()
+
+        # assert
+        assert events == [20]
+        m_service.get_events.assert_not_called()
+
+    def test_get_events_releases_lock_before_yielding(self, tmp_path):
+        # arrange
+        lock_file = str(tmp_path / "fake.lock")
+        m_cache = Mock(metadata={})
+        m_cache.load_cache.return_value = ([], False)
+        m_service = Mock()
+        m_service.get_events.return_value = iter([1, 2])
+        calendar = FakeCalendar(
+            "Fake", cache_manager=m_cache, service=m_service, lock_file=lock_file
+        )
+
+        # act
+        events = iter(calendar.get_events())
+        first = next(events)
+
+        with file_lock(lock_file, timeout=0) as contended:
+            pass
+
+        # assert
+        assert first == 10
+        assert not contended
+        assert list(events) == [20]
+        m_cache.build_cache.assert_called_once()
+
+
+class TestAdaptiveTtl:
+    @staticmethod
+    def _calendar(tmp_path, events) -> FakeCalendar:
+        m_service = Mock()
+        m_service.get_events.side_effect = lambda: iter(events)
+        return FakeCalendar(
+            "Fake",
+            cache_manager=JsonCacheManager(str(tmp_path / "fake.json")),
+            service=m_service,
+            ttl=600,
+            ttl_bounds=(300, 2400),
+        )
+
+    def test_ttl_follows_changes(self, tmp_path):
+        # arrange
+        events = [1, 2]
+        calendar = self._calendar(tmp_path, events)
+        ttls = []
+
+        # act
+        for change in (None, None, None, None, 3, 4, 5):
+            if change:
+                events.append(change)
+
+            list(calendar.get_events(ignore_cache=True))
+            calendar.cache_manager.load_cache()
+            ttls.append(calendar.cache_manager.metadata["ttl"])
+
+        # assert
+        assert ttls == [600, 1200, 2400, 2400, 1200, 600, 300]
+
+    @patch("pycal.api.Arrow.now")
+    def test_cache_is_fresh_for_adapted_ttl(self, m_now, tmp_path):
+        # arrange
+        m_now.return_value = arrow.get(1000)
+        calendar = self._calendar(tmp_path, [1])
+        list(calendar.get_events(ignore_cache=True))
+        list(calendar.get_events(ignore_cache=True))
+        m_now.return_value = arrow.get(2000)
+
+        # act
+        events = list(calendar.get_events())
+
+        # assert
+        assert events == [10]
+        assert calendar.service.get_events.call_count == 2
+
+    def test_float_bounds_build_event_cache(self, tmp_path):
+        # arrange
+        calendar = FakeCalendar(
+            "Fake",
+            cache_manager=JsonCacheManager(str(tmp_path / "fake.json")),
+            service=Mock(get_events=Mock(return_value=iter([1]))),
+            ttl=5000,
+            event_cache=EventCache(str(tmp_path / "fake.events")),
+            ttl_bounds=[60, 3600.0],
+        )
+        calendar._parse_event = lambda event: make_event(  # type: ignore[assignment]
+            str(event), "2022-04-06T09:00", "2022-04-06T10:00"
+        )
+
+        # act
+        events = list(calendar.get_events(ignore_cache=True))
+        calendar.cache_manager.load_cache()
+
+        # assert
+        assert [event.id for event in events] == ["1"]
+        assert calendar.cache_manager.metadata["ttl"] == 3600
+        assert calendar.event_cache is not None
+        assert calendar.event_cache.load(key="") is not None
+
+
+class TestFileLock:
+    def test_file_lock_reports_contention(self, tmp_path):
+        # arrange
+        lock_file = str(tmp_path / "fake.lock")
+
+        with file_lock(lock_file) as first:
+            # act
+            with file_lock(lock_file, timeout=0) as second:
+                pass
+
+        with file_lock(lock_file, timeout=0) as third:
+            pass
+
+        # assert
+        assert (first, second, third) == (False, True, False)
+
+
+def make_event(id: str, start: str, end: str) -> Event:
+    return Event(
+        id=id,
+        title="some event",
+        start_time=arrow.get(start),
+        end_time=arrow.get(end),
+        going=EventStatus.ACCEPTED,
+        location="",
+        type="",
+        video_link="",
+        calendar="Mock Calendar",
+    )
+
+
+def make_epoch_event(id: str, start: int, end: int) -> Event:
+    return Event.from_epochs(
+        id=id,
+        title="some event",
+        start=start,
+        end=end,
+        tz="UTC",
+        location="",
+        going=EventStatus.ACCEPTED,
+        type="",
+        video_link="",
+        calendar="Mock Calendar",
+    )
+
+
+class TestEventIndex:
+    events: List[Event]
+    index: EventIndex
+
+    @classmethod
+    def setup_class(cls):
+        cls.events = [
+            make_event("all day", "2022-04-06T00:00", "2022-04-07T00:00"),
+            make_event("standup", "2022-04-06T09:00", "2022-04-06T09:15"),
+            make_event("lunch", "2022-04-06T12:00", "2022-04-06T13:00"),
+            make_event("review", "2022-04-06T12:30", "2022-04-06T14:00"),
+            make_event("retro", "2022-04-06T16:00", "2022-04-06T17:00"),
+        ]
+        cls.index = EventIndex(cls.events)
+
+    @pytest.mark.parametrize(
+        "when, expected",
+        [
+            ("2022-04-06T09:00", ["all day", "standup"]),
+            ("2022-04-06T12:45", ["all day", "lunch", "review"]),
+            ("2022-04-06T13:00", ["all day", "review"]),
+            ("2022-04-07T00:00", []),
+        ],
+    )
+    def test_at(self, when: str, expected):
+        # act
+        events = self.index.at(arrow.get(when))
+
+        # assert
+        assert [e.id for e in events] == expected
+
+    def test_overlapping(self):
+        # act
+        events = self.index.overlapping(
+            arrow.get("2022-04-06T13:30"), arrow.get("2022-04-06T16:00")
+        )
+
+        # assert
+        assert [e.id for e in events] == ["all day", "review"]
+
+    @pytest.mark.parametrize(
+        "when, expected",
+        [
+            ("2022-04-05T12:00", "all day"),
+            ("2022-04-06T10:30", "standup"),
+            ("2022-04-06T10:31", "lunch"),
+            ("2022-04-07T12:00", "retro"),
+        ],
+    )
+    def test_closest(self, when: str, expected: str):
+        # act
+        event = self.index.closest(arrow.get(when))
+
+        # assert
+        assert event is not None
+        assert event.id == expected
+
+    def test_closest_without_events(self):
+        # act/assert
+        assert EventIndex([]).closest(arrow.get("2022-04-06")) is None
+
+    def test_following(self):
+        # act
+        events = self.index.following(arrow.get("2022-04-06T10:00"), 2)
+
+        # assert
+        assert [e.id for e in events] == ["lunch", "review"]
+
+    def test_between(self):
+        # act
+        events = self.index.between(
+            arrow.get("2022-04-06T09:00"), arrow.get("2022-04-06T16:00")
+        )
+
+        # assert
+        assert [e.id for e in events] == ["standup", "lunch", "review"]
+
+    def test_at_finds_long_event_past_shorter_ones(self):
+        # arrange
+        index = EventIndex(
+            [
+                make_epoch_event(str(i), start, end)
+                for i, (start, end) in enumerate([(0, 1), (1, 2), (2, 100), (3, 4)])
+            ]
+        )
+
+        # act/assert
+        assert [e.id for e in index.at(arrow.get(2.5))] == ["2"]
+        assert [e.id for e in index.overlapping(arrow.get(2.5), arrow.get(2.6))] == [
+            "2"
+        ]
+
+    def test_queries_match_brute_force(self):
+        # arrange
+        rng = random.Random(5)
+
+        for _ in range(300):
+            spans = []
+
+            for _ in range(rng.randint(0, 20)):
+                start = rng.randint(0, 50)
+                spans.append((start, start + rng.randint(0, 30)))
+
+            spans.sort()
+            events = [make_epoch_event(str(i), *span) for i, span in enumerate(spans)]
+            index = EventIndex(events)
+            low = rng.randint(0, 80) + 0.5
+            high = low + rng.randint(0, 10)
+
+            # act
+            at = index.at(arrow.get(low))
+            overlapping = index.overlapping(arrow.get(low), arrow.get(high))
+
+            # assert
+            assert at == [e for e in events if e.start <= low < e.end]
+            assert overlapping == [e for e in events if e.start < high and e.end > low]
 
 
 class TestEventStorage:
@@ -103,3 +959,253 @@ class TestEventStorage:
         # assert
         assert events == []
         m_calendar.get_events.assert_not_called()
+
+    def test_get_events_concurrently(self):
+        # arrange
+        m_event = Event(
+            id="1",
+            title="some event",
+            start_time=arrow.now(),
+            end_time=arrow.now(),
+            going=EventStatus.ACCEPTED,
+            location="",
+            type="",
+            video_link="",
+            calendar="Mock Calendar",
+        )
+        m_calendar = Mock(spec=BaseCalendar)
+        m_calendar.get_events.return_value = iter([m_event])
+        m_calendar.name = "Mock Calendar"
+        m_config = Mock(calendars=[m_calendar])
+
+        storage = EventStorage(m_config, concurrent=True, timeout=1)
+
+        # act
+        events = list(storage.get_events())
+
+        # assert
+        assert events == [m_event]
+        assert "Mock Calendar" in storage.timings
+
+    def test_get_events_concurrently_skips_failed_calendars(self):
+        # arrange
+        m_calendar = Mock(spec=BaseCalendar)
+        m_calendar.get_events.side_effect = ConnectionError
+        m_calendar.name = "Mock Calendar"
+        m_config = Mock(calendars=[m_calendar])
+
+        storage = EventStorage(m_config, concurrent=True, timeout=1)
+
+        # act
+        events = list(storage.get_events())
+
+        # assert
+        assert events == []
+        assert "Mock Calendar" in storage.timings
+
+    def test_get_events_concurrently_streams_calendars(self):
+        # arrange
+        consumed = []
+
+        def events():
+            for hour in range(1, 6):
+                consumed.append(hour)
+                yield make_event(
+                    f"{hour}", f"2022-04-06T0{hour}:00", "2022-04-06T09:00"
+                )
+
+        m_calendar = Mock(spec=BaseCalendar)
+        m_calendar.get_events.return_value = events()
+        m_calendar.name = "Mock Calendar"
+        storage = EventStorage(Mock(calendars=[m_calendar]), concurrent=True, timeout=1)
+
+        # act
+        first = next(iter(storage.get_events()))
+
+        # assert
+        assert first.id == "1"
+        assert consumed == [1, 2]
+
+    def test_get_index_traces_merge(self):
+        # arrange
+        tracer = tracing.enable()
+        m_calendar = Mock(spec=BaseCalendar)
+        m_calendar.get_events.return_value = [
+            make_event("1", "2022-04-06T01:00", "2022-04-06T02:00")
+        ]
+        m_calendar.name = "Mock Calendar"
+        storage = EventStorage(Mock(calendars=[m_calendar]))
+
+        # act
+        try:
+            storage.get_index()
+        finally:
+            tracing.disable()
+
+        # assert
+        lines = tracer.report().splitlines()
+        assert [line.split()[0] for line in lines] == ["storage.index", "storage.merge"]
+
+    def test_get_events_concurrently_authorizes_before_fetching(self):
+        # arrange
+        threads = []
+        m_calendar = Mock(spec=BaseCalendar)
+        m_calendar.get_events.return_value = iter([])
+        m_calendar.name = "Mock Calendar"
+        m_calendar.authorize.side_effect = lambda calendars: threads.append(
+            threading.current_thread()
+        )
+        storage = EventStorage(Mock(calendars=[m_calendar]), concurrent=True, timeout=1)
+
+        # act
+        list(storage.get_events())
+
+        # assert
+        m_calendar.authorize.assert_called_once_with([m_calendar])
+        assert threads == [threading.current_thread()]
+
+    def test_get_events_concurrently_times_out_slow_prefetch(self):
+        # arrange
+        release = threading.Event()
+        m_event = make_event("1", "2022-04-06T09:00", "2022-04-06T10:00")
+        m_slow = Mock(spec=BaseCalendar)
+        m_slow.name = "Slow Calendar"
+        m_slow.prefetch.side_effect = lambda calendars, ignore_cache: release.wait(5)
+        m_slow.get_events.return_value = iter([])
+        m_fast = Mock(spec=BaseCalendar)
+        m_fast.name = "Fast Calendar"
+        m_fast.get_events.return_value = iter([m_event])
+        storage = EventStorage(
+            Mock(calendars=[m_slow, m_fast]), concurrent=True, timeout=0.2
+        )
+
+        # act
+        start = time.monotonic()
+        events = list(storage.get_events())
+        elapsed = time.monotonic() - start
+        release.set()
+
+        # assert
+        assert events == [m_event]
+        assert elapsed < 1
+        m_fast.prefetch.assert_called_once_with([m_fast], False)
+
+    @patch("pycal.api.Arrow.now")
+    def test_get_events_concurrently_revalidates_stale_cache(self, m_now, tmp_path):
+        # arrange
+        m_now.return_value = arrow.get(1000)
+        cache_manager = JsonCacheManager(str(tmp_path / "fake.json"))
+        cache_manager.build_cache([1, 2])
+        m_now.return_value = arrow.get(1200)
+        m_service = Mock()
+        m_service.get_events.return_value = iter([3])
+        calendar = FakeCalendar(
+            "Fake",
+            cache_manager=cache_manager,
+            service=m_service,
+            ttl=100,
+            max_stale=600,
+        )
+        calendar._parse_event = lambda event: make_event(  # type: ignore[assignment]
+            str(event), "2022-04-06T09:00", "2022-04-06T10:00"
+        )
+        storage = EventStorage(Mock(calendars=[calendar]), concurrent=True, timeout=1)
+
+        # act
+        events = list(storage.get_events())
+        revalidation = calendar._revalidation
+        assert revalidation is not None
+        revalidation.join(1)
+
+        # assert
+        assert [event.id for event in events] == ["1", "2"]
+        assert not revalidation.daemon
+        assert cache_manager.load_cache(100) == ([3], True)
+
+    def test_get_events_at_builds_index_once(self):
+        # arrange
+        m_event = make_event("1", "2022-04-06T09:00", "2022-04-06T10:00")
+        m_calendar = Mock(spec=BaseCalendar)
+        m_calendar.get_events.return_value = iter([m_event])
+        m_calendar.name = "Mock Calendar"
+        m_config = Mock(calendars=[m_calendar])
+
+        storage = EventStorage(m_config)
+
+        # act
+        during = storage.get_events_at(arrow.get("2022-04-06T09:30"))
+        after = storage.get_events_at(arrow.get("2022-04-06T10:30"))
+
+        # assert
+        assert during == [m_event]
+        assert after == []
+        assert list(storage.get_events()) == [m_event]
+        m_calendar.get_events.assert_called_once()
+
+    def test_get_events_between_reads_calendars_from_start(self):
+        # arrange
+        m_events = [
+            make_event("1", "2022-04-06T09:00", "2022-04-06T10:00"),
+            make_event("2", "2022-04-06T12:00", "2022-04-06T13:00"),
+            make_event("3", "2022-04-06T15:00", "2022-04-06T16:00"),
+        ]
+        m_calendar = Mock(spec=BaseCalendar)
+        m_calendar.get_events.return_value = iter(m_events)
+        m_calendar.name = "Mock Calendar"
+        storage = EventStorage(Mock(calendars=[m_calendar]))
+        start = arrow.get("2022-04-06T10:00")
+
+        # act
+        events = storage.get_events_between(start, arrow.get("2022-04-06T15:00"))
+
+        # assert
+        assert events == [m_events[1]]
+        m_calendar.get_events.assert_called_once_with(False, since=start.timestamp())
+        assert storage._events is None
+
+    @pytest.mark.parametrize(
+        "when, expected", [("2022-04-06T10:00", "1"), ("2022-04-06T11:00", "2")]
+    )
+    def test_get_closest_event_stops_early(self, when: str, expected: str):
+        # arrange
+        m_events = [
+            make_event("1", "2022-04-06T09:00", "2022-04-06T10:00"),
+            make_event("2", "2022-04-06T12:00", "2022-04-06T13:00"),
+            make_event("3", "2022-04-06T15:00", "2022-04-06T16:00"),
+            make_event("4", "2022-04-06T18:00", "2022-04-06T19:00"),
+        ]
+        m_iterator = iter(m_events)
+        m_calendar = Mock(spec=BaseCalendar)
+        m_calendar.get_events.return_value = m_iterator
+        m_calendar.name = "Mock Calendar"
+        m_config = Mock(calendars=[m_calendar])
+
+        storage = EventStorage(m_config)
+
+        # act
+        event = storage.get_closest_event(when=arrow.get(when))
+
+        # assert
+        assert event is not None
+        assert event.id == expected
+        assert next(m_iterator).id == "4"
+
+    def test_get_next_events(self):
+        # arrange
+        m_events = [
+            make_event("1", "2022-04-06T09:00", "2022-04-06T10:00"),
+            make_event("2", "2022-04-06T12:00", "2022-04-06T13:00"),
+            make_event("3", "2022-04-06T15:00", "2022-04-06T16:00"),
+        ]
+        m_calendar = Mock(spec=BaseCalendar)
+        m_calendar.get_events.return_value = iter(m_events)
+        m_calendar.name = "Mock Calendar"
+        m_config = Mock(calendars=[m_calendar])
+
+        storage = EventStorage(m_config)
+
+        # act
+        events = storage.get_next_events(1, when=arrow.get("2022-04-06T10:00"))
+
+        # assert
+        assert events == [m_events[1]]
@@ -1,17 +1,21 @@
-from textual.widgets import ScrollView, Header
+import asyncio
+from typing import Optional
+
+from textual.widgets import Header
 from textual.app import App
 from pycal.config import Config
 
-from pycal.ui import FooterWidget
+from pycal.ui import FooterWidget, VirtualScrollView
 from pycal.views import CalendarView
 
 
 class PyCalendar(App):
     def __init__(self, calendar_view: CalendarView, config: Config, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.body: ScrollView
+        self.body: VirtualScrollView
         self.calendar_view = calendar_view
         self.config = config
+        self._refresh_task: Optional[asyncio.Task] = None
 
     async def _bind_keys(self):
         for action, key in self.config.load_keybindings(self.calendar_view).items():
@@ -22,7 +26,7 @@ class PyCalendar(App):
             )
 
     async def on_mount(self) -> None:
-        self.body = ScrollView()
+        self.body = VirtualScrollView()
 
         if self.config.layout.show_header:
             await self.view.dock(Header(style="white on black"), edge="top")
@@ -54,7 +58,29 @@ class PyCalendar(App):
 
     async def action_refresh(self) -> None:
         """"""
-        self.calendar_view.reload_events()
+        if self._refresh_task and not self._refresh_task.done():
+            return
+
+        self._refresh_task = asyncio.create_task(self._refresh_events())
+
+    async def _refresh_events(self) -> None:
+        self.sub_title = "refreshing..."
+
+        # Calendars are fetched off the event loop; the current events stay
+        # on screen until the new ones are swapped in at once.
+        try:
+            events = await asyncio.get_running_loop().run_in_executor(
+                None, self.calendar_view.fetch_events, True
+            )
+        except Exception as error:
+            # Nobody awaits the task, so a failed fetch is reported here and
+            # the events already shown are kept.
+            self.log(f"refresh failed: {error!r}")
+            self.sub_title = f"refresh failed: {error}"
+            return
+
+        self.sub_title = ""
+        self.calendar_view.show_events(events)
         await self.calendar_view.select_first(self.body)
 
     async def action_join_meeting(self) -> None:
@@ -1,5 +1,7 @@
-from typing import TYPE_CHECKING, Callable, Dict, Generator, List
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+from importlib import import_module
 import os
+import pickle
 import yaml
 
 
@@ -9,6 +11,14 @@ if TYPE_CHECKING:
     CalendarFactory = Callable[[str, Dict], BaseCalendar]
 
 
+# libyaml is several times faster than the pure Python loader when present.
+Loader = getattr(yaml, "CFullLoader", yaml.FullLoader)
+
+
+class ConfigError(Exception):
+    pass
+
+
 class Layout:
     def __init__(self, config: Dict):
         self.config = config
@@ -21,26 +31,165 @@ class Layout:
     def show_footer(self) -> bool:
         return self.config.get("show_footer", True)
 
+    @property
+    def virtualized(self) -> bool:
+        return self.config.get("virtualized", True)
+
+
+class Fetching:
+    def __init__(self, config: Dict):
+        self.config = config
+
+    @property
+    def concurrent(self) -> bool:
+        return self.config.get("concurrent", False)
+
+    @property
+    def timeout(self) -> Optional[float]:
+        return self.config.get("timeout", 10)
+
 
 class Config:
     FACTORIES: Dict[str, "CalendarFactory"] = {}
+    PROVIDERS: Dict[str, str] = {
+        "GoogleCalendar": "pycal.api.providers.google_calendar:GoogleCalendar",
+        "IcsCalendar": "pycal.api.providers.ics_calendar:IcsCalendar",
+    }
+
+    # Settings each provider's from_settings reads without a default.
+    REQUIRED: Dict[str, Tuple[str, ...]] = {
+        "GoogleCalendar": ("credentials",),
+        "IcsCalendar": ("path",),
+    }
+
+    CACHE_VERSION = 4
+    SECTIONS = ("system", "layout", "fetching", "agenda")
+
+    @classmethod
+    def _read_file(cls, file_path: str) -> Dict[str, Any]:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return cls._parse_file(file_path)
+
+        # The validated config is pickled next to the YAML file and reused
+        # until the file's mtime or size changes.
+        key = (cls.CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+        cache_file = f"{file_path}.cache"
+
+        try:
+            with open(cache_file, "rb") as f:
+                cached_key, config = pickle.load(f)
+
+            if cached_key == key:
+                return config
+        except Exception:
+            pass
+
+        config = cls._parse_file(file_path)
+        temp_file = f"{cache_file}.{os.getpid()}.tmp"
+
+        try:
+            with open(temp_file, "wb") as f:
+                pickle.dump((key, config), f, pickle.HIGHEST_PROTOCOL)
+
+            os.replace(temp_file, cache_file)
+        except OSError:
+            pass
+
+        return config
+
+    @classmethod
+    def _parse_file(cls, file_path: str) -> Dict[str, Any]:
+        with open(file_path, "r") as f:
+            config = yaml.load(f, Loader=Loader)
+
+        cls._validate(file_path, config)
+        return config
+
+    @classmethod
+    def _validate(cls, file_path: str, config: Any) -> None:
+        if not isinstance(config, dict):
+            raise ConfigError(f"{file_path}: expected a mapping of settings")
+
+        for section in cls.SECTIONS:
+            if not isinstance(config.get(section, {}), dict):
+                raise ConfigError(f"{file_path}: '{section}' must be a mapping")
+
+        if not isinstance(config.get("system", {}).get("browser"), str):
+            raise ConfigError(f"{file_path}: 'system.browser' must be set")
+
+        if not isinstance(config.get("agenda", {}).get("bindings"), dict):
+            raise ConfigError(f"{file_path}: 'agenda.bindings' must be a mapping")
+
+        if not isinstance(config.get("calendars"), list):
+            raise ConfigError(f"{file_path}: 'calendars' must be a list")
+
+        for calendar in config["calendars"]:
+            if not isinstance(calendar, dict):
+                raise ConfigError(f"{file_path}: calendars must be named mappings")
+
+            for name, settings in calendar.items():
+                cls._validate_calendar(file_path, name, settings)
+
+    @classmethod
+    def _validate_calendar(cls, file_path: str, name: str, settings: Any) -> None:
+        if not isinstance(settings, dict) or "type" not in settings:
+            raise ConfigError(f"{file_path}: calendar {name!r} has no type")
+
+        calendar_type = settings["type"]
+
+        if calendar_type not in cls.PROVIDERS and calendar_type not in cls.FACTORIES:
+            raise ConfigError(
+                f"{file_path}: calendar {name!r} has unknown type {calendar_type!r}"
+            )
+
+        for key in cls.REQUIRED.get(calendar_type, ()):
+            if key not in settings:
+                raise ConfigError(f"{file_path}: calendar {name!r} has no {key!r}")
+
+        if "adaptive_ttl" in settings and not cls._is_ttl_range(
+            settings["adaptive_ttl"]
+        ):
+            raise ConfigError(
+                f"{file_path}: calendar {name!r} needs 'adaptive_ttl' as "
+                "[low, high] seconds with 0 < low <= high"
+            )
 
     @staticmethod
-    def _read_file(file_path: str):
-        with open(file_path, "r") as f:
-            return yaml.load(f, Loader=yaml.FullLoader)
+    def _is_ttl_range(value: Any) -> bool:
+        if not isinstance(value, list) or len(value) != 2:
+            return False
+
+        if not all(type(ttl) is int and ttl > 0 for ttl in value):
+            return False
+
+        return value[0] <= value[1]
 
     def __init__(self):
         self._config = self._read_file(os.path.expanduser("~/.pycal.yml"))
         self._layout = Layout(self._config.get("layout", {}))
+        self._fetching = Fetching(self._config.get("fetching", {}))
         self._calendars: List[BaseCalendar] = []
 
+    @classmethod
+    def _load_factory(cls, calendar_type: str) -> "CalendarFactory":
+        if calendar_type not in cls.FACTORIES:
+            if calendar_type not in cls.PROVIDERS:
+                raise ConfigError(f"unknown calendar type {calendar_type!r}")
+
+            module_name, class_name = cls.PROVIDERS[calendar_type].split(":")
+            provider = getattr(import_module(module_name), class_name)
+            cls.FACTORIES[calendar_type] = provider.from_settings
+
+        return cls.FACTORIES[calendar_type]
+
     @property
     def calendars(self) -> List["BaseCalendar"]:
         if not self._calendars:
             for calendar in self._config["calendars"]:
                 for name, config in calendar.items():
-                    factory = self.FACTORIES[config["type"]]
+                    factory = self._load_factory(config["type"])
                     self._calendars.append(factory(name, config))
 
         return self._calendars
@@ -49,6 +198,10 @@ class Config:
     def layout(self) -> Layout:
         return self._layout
 
+    @property
+    def fetching(self) -> Fetching:
+        return self._fetching
+
     @property
     def browser(self) -> str:
         return self._config["system"]["browser"]
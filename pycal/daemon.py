@@ -0,0 +1,269 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import arrow
+
+from pycal.api import Event, EventIndex, EventStatus, EventStorage, Moment
+from pycal.config import Config
+
+
+SOCKET_PATH = os.path.expanduser("~/.pycal.sock")
+
+
+class DaemonError(Exception):
+    pass
+
+
+def serialize_event(event: Event) -> Dict[str, Any]:
+    return {
+        "id": event.id,
+        "title": event.title,
+        "start": event.start,
+        "end": event.end,
+        "tz": event.tz,
+        "location": event.location,
+        "going": event.going.value,
+        "type": event.type,
+        "video_link": event.video_link,
+        "calendar": event.calendar,
+    }
+
+
+def deserialize_event(data: Dict[str, Any]) -> Event:
+    return Event.from_epochs(**{**data, "going": EventStatus(data["going"])})
+
+
+class EventRequestHandler(socketserver.StreamRequestHandler):
+    server: "EventServer"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            command, *args = line.decode().split() or [""]
+
+            try:
+                response = {"ok": True, "result": self.server.dispatch(command, args)}
+            except Exception as error:
+                response = {"ok": False, "error": f"{type(error).__name__}: {error}"}
+
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class EventServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        storage: EventStorage,
+        socket_path: str = SOCKET_PATH,
+        refresh_interval: float = 300,
+    ):
+        self.storage = storage
+        self.socket_path = socket_path
+        self.refresh_interval = refresh_interval
+        self.index = EventIndex(storage.get_events())
+        self._stopped = threading.Event()
+        self._refreshing = threading.Lock()
+        self._refresher = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._commands: Dict[str, Callable[..., Any]] = {
+            "PING": lambda: "PONG",
+            "EVENTS": self._events,
+            "CLOSEST": self._closest,
+            "NEXT": self._next,
+            "AT": self._at,
+            "BETWEEN": self._between,
+            "OVERLAPPING": self._overlapping,
+            "REFRESH": self.refresh,
+        }
+
+        super().__init__(socket_path, EventRequestHandler)
+
+    def refresh(self) -> int:
+        # REFRESH requests and the periodic refresh share the storage, so they
+        # take turns; queries keep reading the previous index meanwhile.
+        with self._refreshing:
+            self.index = EventIndex(self.storage.get_events(ignore_cache=True))
+            return len(self.index)
+
+    def _refresh_loop(self) -> None:
+        while not self._stopped.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception:
+                continue
+
+    def dispatch(self, command: str, args: List[str]) -> Any:
+        if command not in self._commands:
+            raise DaemonError(f"unknown command {command!r}")
+
+        return self._commands[command](*args)
+
+    def _events(self) -> List[Dict[str, Any]]:
+        return [serialize_event(event) for event in self.index.events]
+
+    def _closest(self, when: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        event = self.index.closest(arrow.get(float(when)) if when else arrow.now())
+        return serialize_event(event) if event else None
+
+    def _next(self, count: str, when: Optional[str] = None) -> List[Dict[str, Any]]:
+        start = arrow.get(float(when)) if when else arrow.now()
+        return [serialize_event(e) for e in self.index.following(start, int(count))]
+
+    def _at(self, when: str) -> List[Dict[str, Any]]:
+        return [serialize_event(e) for e in self.index.at(arrow.get(float(when)))]
+
+    def _between(self, start: str, end: str) -> List[Dict[str, Any]]:
+        events = self.index.between(arrow.get(float(start)), arrow.get(float(end)))
+        return [serialize_event(e) for e in events]
+
+    def _overlapping(self, start: str, end: str) -> List[Dict[str, Any]]:
+        events = self.index.overlapping(arrow.get(float(start)), arrow.get(float(end)))
+        return [serialize_event(e) for e in events]
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        self._refresher.start()
+
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            self._stopped.set()
+
+    def server_close(self) -> None:
+        super().server_close()
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class DaemonClient:
+    def __init__(self, socket_path: str = SOCKET_PATH, timeout: float = 2.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def request(self, command: str, *args: Any) -> Any:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(self.timeout)
+            connection.connect(self.socket_path)
+            connection.sendall(" ".join([command, *map(str, args)]).encode() + b"\n")
+
+            with connection.makefile("rb") as stream:
+                line = stream.readline()
+
+        if not line:
+            raise DaemonError("connection closed by daemon")
+
+        response = json.loads(line)
+
+        if not response["ok"]:
+            raise DaemonError(response["error"])
+
+        return response["result"]
+
+    def is_running(self) -> bool:
+        try:
+            return self.request("PING") == "PONG"
+        except (OSError, DaemonError):
+            return False
+
+
+class DaemonEventStorage(EventStorage):
+    def __init__(self, config: Config, client: DaemonClient, **kwargs):
+        super().__init__(config, **kwargs)
+        self.client = client
+
+    def _remote(self, command: str, *args: Any) -> Optional[List[Event]]:
+        try:
+            result = self.client.request(command, *args)
+        except (OSError, ValueError, DaemonError):
+            return None
+
+        if isinstance(result, dict):
+            result = [result]
+
+        return [deserialize_event(data) for data in result or []]
+
+    def get_events(self, ignore_cache: bool = False) -> Iterable[Event]:
+        if not ignore_cache and (events := self._remote("EVENTS")) is not None:
+            return iter(events)
+
+        return super().get_events(ignore_cache)
+
+    def get_closest_event(
+        self, ignore_cache: bool = False, when: Optional[Moment] = None
+    ) -> Optional[Event]:
+        if not ignore_cache:
+            args = [when.timestamp()] if when else []
+
+            if (events := self._remote("CLOSEST", *args)) is not None:
+                return events[0] if events else None
+
+        return super().get_closest_event(ignore_cache, when)
+
+    def get_next_events(
+        self, count: int, ignore_cache: bool = False, when: Optional[Moment] = None
+    ) -> List[Event]:
+        if not ignore_cache:
+            args = [count, when.timestamp()] if when else [count]
+
+            if (events := self._remote("NEXT", *args)) is not None:
+                return events
+
+        return super().get_next_events(count, ignore_cache, when)
+
+    def get_events_at(self, when: Moment, ignore_cache: bool = False) -> List[Event]:
+        if (
+            not ignore_cache
+            and (events := self._remote("AT", when.timestamp())) is not None
+        ):
+            return events
+
+        return super().get_events_at(when, ignore_cache)
+
+    def get_events_between(
+        self, start: Moment, end: Moment, ignore_cache: bool = False
+    ) -> List[Event]:
+        if (
+            not ignore_cache
+            and (events := self._remote("BETWEEN", start.timestamp(), end.timestamp()))
+            is not None
+        ):
+            return events
+
+        return super().get_events_between(start, end, ignore_cache)
+
+    def get_overlapping_events(
+        self, start: Moment, end: Moment, ignore_cache: bool = False
+    ) -> List[Event]:
+        if (
+            not ignore_cache
+            and (
+                events := self._remote(
+                    "OVERLAPPING", start.timestamp(), end.timestamp()
+                )
+            )
+            is not None
+        ):
+            return events
+
+        return super().get_overlapping_events(start, end, ignore_cache)
+
+
+def serve(
+    storage: EventStorage,
+    socket_path: str = SOCKET_PATH,
+    refresh_interval: float = 300,
+) -> None:
+    if os.path.exists(socket_path):
+        if DaemonClient(socket_path).is_running():
+            raise DaemonError(f"pycal daemon already listening on {socket_path}")
+
+        os.unlink(socket_path)
+
+    with EventServer(storage, socket_path, refresh_interval) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -1,23 +1,70 @@
 #!/usr/bin/env python
+import os
+import sys
+from typing import List
+
 import click
 import arrow
 
-from pycal import views
-from pycal.config import Config
-from pycal.api import EventStorage
-from pycal.api.providers.google_calendar import GoogleCalendar
+from pycal import tracing
+from pycal.config import Config, ConfigError
+from pycal.api import BaseCalendar, EventStorage
+from pycal.daemon import SOCKET_PATH, DaemonClient, DaemonEventStorage, serve
+
+
+def revalidate_command() -> List[str]:
+    # Frozen builds are the pycal executable itself.
+    if getattr(sys, "frozen", False):
+        return [sys.executable, "revalidate"]
+
+    return [sys.executable, "-m", "pycal.main", "revalidate"]
 
-from pycal.app import PyCalendar
-from pycal.views.agenda import Agenda
+
+def report_profile(tracer: tracing.Tracer, profile: bool, trace_file: str) -> None:
+    if profile:
+        click.echo(tracer.report(), err=True)
+
+    if trace_file:
+        tracer.write_chrome_trace(trace_file)
 
 
 @click.group()
+@click.option(
+    "--profile", default=False, is_flag=True, help="Print a timing tree on exit."
+)
+@click.option(
+    "--trace-file",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write a Chrome trace-event JSON file.",
+)
 @click.pass_context
-def cli(ctx):
-    config = Config()
-    config.FACTORIES["GoogleCalendar"] = GoogleCalendar.from_settings
-    storage = EventStorage(config)
+def cli(ctx, profile, trace_file):
     ctx.ensure_object(dict)
+
+    # Stale caches are refreshed by a detached pycal process, so commands
+    # exit as soon as they have printed.
+    BaseCalendar.revalidate_command = revalidate_command()
+
+    if profile or trace_file:
+        tracer = tracing.enable()
+        ctx.call_on_close(lambda: report_profile(tracer, profile, trace_file))
+
+    try:
+        with tracing.span("config"):
+            config = Config()
+    except ConfigError as error:
+        raise click.ClickException(str(error))
+
+    options = {
+        "concurrent": config.fetching.concurrent,
+        "timeout": config.fetching.timeout,
+    }
+
+    if os.path.exists(SOCKET_PATH):
+        storage: EventStorage = DaemonEventStorage(config, DaemonClient(), **options)
+    else:
+        storage = EventStorage(config, **options)
+
     ctx.obj["config"] = config
     ctx.obj["storage"] = storage
 
@@ -25,12 +72,18 @@ def cli(ctx):
 @click.command()
 @click.pass_context
 def agenda(ctx):
-    agenda = views.Agenda(ctx.obj["storage"])
+    # The UI stack is only imported by the interactive command so that
+    # `pycal next` stays cheap to start.
+    from pycal.app import PyCalendar
+    from pycal.views import Agenda
+
+    config = ctx.obj["config"]
+    agenda = Agenda(ctx.obj["storage"], virtualized=config.layout.virtualized)
 
     PyCalendar.run(
         calendar_view=agenda,
         title="PyCal",
-        config=ctx.obj["config"],
+        config=config,
     )
 
 
@@ -63,8 +116,38 @@ def next(ctx, join, nocache):
         storage.join_event(closest_event)
 
 
+@click.command()
+@click.pass_context
+@click.option(
+    "--interval",
+    default=300,
+    show_default=True,
+    help="Seconds between calendar refreshes.",
+)
+def daemon(ctx, interval):
+    config = ctx.obj["config"]
+    storage = EventStorage(
+        config,
+        concurrent=config.fetching.concurrent,
+        timeout=config.fetching.timeout,
+    )
+
+    serve(storage, SOCKET_PATH, refresh_interval=interval)
+
+
+@click.command(hidden=True)
+@click.pass_context
+@click.argument("name")
+def revalidate(ctx, name):
+    for calendar in ctx.obj["config"].calendars:
+        if calendar.name == name:
+            calendar.revalidate()
+
+
 cli.add_command(agenda)
 cli.add_command(next)
+cli.add_command(daemon)
+cli.add_command(revalidate)
 
 
 if __name__ == "__main__":
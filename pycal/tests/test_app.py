@@ -1,10 +1,13 @@
+import asyncio
+import threading
+
 from mock.mock import AsyncMock, Mock, patch
 import pytest
 from pycal.app import PyCalendar
 
 
 @pytest.mark.asyncio
-@patch("pycal.app.ScrollView", AsyncMock)
+@patch("pycal.app.VirtualScrollView", AsyncMock)
 class TestApp:
     @patch("pycal.app.Header", Mock(return_value=1))
     async def test_mount_header(self):
@@ -79,15 +82,64 @@ class TestApp:
 
     async def test_invoke_refresh_events(self):
         # arrange
-        app = PyCalendar(calendar_view=AsyncMock(), config=Mock())
+        m_view = AsyncMock()
+        m_view.fetch_events = Mock(return_value=[1, 2])
+        m_view.show_events = Mock()
+        app = PyCalendar(calendar_view=m_view, config=Mock())
+        app.body = Mock()
+
+        # act
+        await app.action_refresh()
+        await app._refresh_task
+
+        # assert
+        m_view.fetch_events.assert_called_once_with(True)
+        m_view.show_events.assert_called_once_with([1, 2])
+        m_view.select_first.assert_called_once_with(app.body)
+        assert app.sub_title == ""
+
+    async def test_refresh_failure_keeps_events(self):
+        # arrange
+        m_view = AsyncMock()
+        m_view.fetch_events = Mock(side_effect=OSError("network is unreachable"))
+        m_view.show_events = Mock()
+        app = PyCalendar(calendar_view=m_view, config=Mock())
         app.body = Mock()
 
         # act
         await app.action_refresh()
+        await app._refresh_task
+
+        # assert
+        m_view.show_events.assert_not_called()
+        assert app.sub_title == "refresh failed: network is unreachable"
+
+    async def test_refresh_ignored_while_in_flight(self):
+        # arrange
+        fetching = threading.Event()
+
+        def fetch_events(ignore_cache):
+            fetching.wait(1)
+            return []
+
+        m_view = AsyncMock()
+        m_view.fetch_events = Mock(side_effect=fetch_events)
+        m_view.show_events = Mock()
+        app = PyCalendar(calendar_view=m_view, config=Mock())
+        app.body = Mock()
+
+        # act
+        await app.action_refresh()
+        await asyncio.sleep(0)
+        refreshing = app.sub_title
+        await app.action_refresh()
+        fetching.set()
+        await app._refresh_task
 
         # assert
-        app.calendar_view.reload_events.assert_called_once()
-        app.calendar_view.select_first.assert_called_once_with(app.body)
+        assert refreshing == "refreshing..."
+        m_view.fetch_events.assert_called_once_with(True)
+        m_view.show_events.assert_called_once_with([])
 
     async def test_invoke_join_meeting(self):
         # arrange
@@ -1,8 +1,10 @@
+import os
 from typing import Dict
 from mock import mock_open
 from mock.mock import Mock, patch
+import pytest
 from pycal.api import BaseCalendar, Event
-from pycal.config import Config
+from pycal.config import Config, ConfigError
 
 
 m_config = """
@@ -44,6 +46,8 @@ class FakeCalendar(BaseCalendar[Dict]):
 class TestConfig:
     @classmethod
     def setup_class(cls):
+        Config.FACTORIES["FakeCalendar"] = FakeCalendar.fake_factory
+
         with patch("pycal.config.open", mock_open(read_data=m_config)):
             cls.config = Config()
 
@@ -52,9 +56,6 @@ class TestConfig:
         assert self.config.browser == "brave"
 
     def test_load_calendars(self):
-        # arrange
-        self.config.FACTORIES["FakeCalendar"] = FakeCalendar.fake_factory
-
         # act
         calendar = list(self.config.calendars)[0]
 
@@ -77,3 +78,79 @@ class TestConfig:
         # act/assert
         assert self.config.layout.show_header is False
         assert self.config.layout.show_footer is False
+
+    def test_fetching_defaults(self):
+        # act/assert
+        assert self.config.fetching.concurrent is False
+        assert self.config.fetching.timeout == 10
+
+    def test_read_file_reuses_cache(self, tmp_path):
+        # arrange
+        config_file = tmp_path / ".pycal.yml"
+        config_file.write_text(m_config)
+        Config._read_file(str(config_file))
+
+        # act
+        with patch("pycal.config.yaml.load") as m_load:
+            config = Config._read_file(str(config_file))
+
+        # assert
+        m_load.assert_not_called()
+        assert config["system"]["browser"] == "brave"
+
+    def test_read_file_invalidates_cache(self, tmp_path):
+        # arrange
+        config_file = tmp_path / ".pycal.yml"
+        config_file.write_text(m_config)
+        Config._read_file(str(config_file))
+        config_file.write_text(m_config.replace("brave", "firefox"))
+        os.utime(config_file, ns=(0, 0))
+
+        # act
+        config = Config._read_file(str(config_file))
+
+        # assert
+        assert config["system"]["browser"] == "firefox"
+
+    def test_read_file_accepts_adaptive_ttl(self, tmp_path):
+        # arrange
+        config_file = tmp_path / ".pycal.yml"
+        config_file.write_text(
+            m_config.replace("type:", "adaptive_ttl: [60, 3600]\n      type:")
+        )
+
+        # act
+        config = Config._read_file(str(config_file))
+
+        # assert
+        assert config["calendars"][0]["Test Calendar"]["adaptive_ttl"] == [60, 3600]
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            "- not a mapping",
+            "layout: []\ncalendars: []",
+            "system:\n  browser: brave",
+            "calendars:\n  - Test Calendar:\n      credentials: foo.json",
+            m_config.replace("browser: brave", "editor: vim"),
+            m_config.replace("  bindings:", "  keys:"),
+            m_config.replace("type: FakeCalendar", "type: OtherCalendar"),
+            m_config.replace("type: FakeCalendar", "type: GoogleCalendar").replace(
+                "credentials:", "calendarId:"
+            ),
+            m_config.replace("type:", "adaptive_ttl: 60\n      type:"),
+            m_config.replace("type:", "adaptive_ttl: [60]\n      type:"),
+            m_config.replace("type:", "adaptive_ttl: [0, 60]\n      type:"),
+            m_config.replace("type:", "adaptive_ttl: [3600, 60]\n      type:"),
+            m_config.replace("type:", "adaptive_ttl: [60, 3600.0]\n      type:"),
+        ],
+    )
+    def test_read_file_validates_schema(self, tmp_path, content: str):
+        # arrange
+        config_file = tmp_path / ".pycal.yml"
+        config_file.write_text(content)
+
+        # act/assert
+        with pytest.raises(ConfigError):
+            Config._read_file(str(config_file))
+        assert not os.path.exists(f"{config_file}.cache")
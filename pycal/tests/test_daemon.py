@@ -0,0 +1,157 @@
+import os
+import tempfile
+import threading
+import time
+
+import arrow
+from mock import Mock
+import pytest
+
+from pycal.api import BaseCalendar, Event, EventStatus, EventStorage
+from pycal.daemon import (
+    DaemonClient,
+    DaemonError,
+    DaemonEventStorage,
+    EventServer,
+    deserialize_event,
+    serialize_event,
+)
+
+
+def make_event(id: str, start: str, end: str) -> Event:
+    return Event(
+        id=id,
+        title="some event",
+        start_time=arrow.get(start),
+        end_time=arrow.get(end),
+        going=EventStatus.ACCEPTED,
+        location="",
+        type="",
+        video_link=None,
+        calendar="Mock Calendar",
+    )
+
+
+m_events = [
+    make_event("1", "2022-04-06T09:00", "2022-04-06T10:00"),
+    make_event("2", "2022-04-06T12:00", "2022-04-06T13:00"),
+]
+
+
+@pytest.fixture
+def server():
+    # unix socket paths are limited to ~100 characters, so avoid pytest's tmp_path
+    with tempfile.TemporaryDirectory() as directory:
+        m_storage = Mock()
+        m_storage.get_events.return_value = iter(m_events)
+        server = EventServer(m_storage, os.path.join(directory, "pycal.sock"))
+        thread = threading.Thread(
+            target=server.serve_forever, args=(0.01,), daemon=True
+        )
+        thread.start()
+
+        yield server
+
+        server.shutdown()
+        server.server_close()
+
+
+def test_serialize_event_roundtrip():
+    # act
+    event = deserialize_event(serialize_event(m_events[0]))
+
+    # assert
+    assert event == m_events[0]
+
+
+class TestEventServer:
+    def test_ping(self, server):
+        # act/assert
+        assert DaemonClient(server.server_address).is_running()
+
+    def test_closest(self, server):
+        # arrange
+        client = DaemonClient(server.server_address)
+
+        # act
+        result = client.request("CLOSEST", arrow.get("2022-04-06T11:30").timestamp())
+
+        # assert
+        assert deserialize_event(result) == m_events[1]
+
+    def test_unknown_command(self, server):
+        # act/assert
+        with pytest.raises(DaemonError):
+            DaemonClient(server.server_address).request("FOO")
+
+    def test_refresh_swaps_index(self, server):
+        # arrange
+        server.storage.get_events.return_value = iter(m_events[:1])
+
+        # act
+        count = DaemonClient(server.server_address).request("REFRESH")
+
+        # assert
+        assert count == 1
+        server.storage.get_events.assert_called_with(ignore_cache=True)
+
+    def test_refreshes_do_not_overlap(self):
+        # arrange
+        active = []
+        overlaps = []
+
+        def events():
+            active.append(1)
+            overlaps.append(len(active))
+            time.sleep(0.05)
+            yield from m_events
+            active.pop()
+
+        m_calendar = Mock(spec=BaseCalendar)
+        m_calendar.name = "Mock Calendar"
+        m_calendar.get_events.side_effect = lambda *args, **kwargs: events()
+        storage = EventStorage(Mock(calendars=[m_calendar]))
+
+        with tempfile.TemporaryDirectory() as directory:
+            server = EventServer(storage, os.path.join(directory, "pycal.sock"))
+            threads = [threading.Thread(target=server.refresh) for _ in range(2)]
+
+            # act
+            for thread in threads:
+                thread.start()
+
+            for thread in threads:
+                thread.join(1)
+
+            server.server_close()
+
+        # assert
+        assert overlaps == [1, 1, 1]
+        assert server.index.events == m_events
+
+
+class TestDaemonEventStorage:
+    def test_get_events_from_daemon(self, server):
+        # arrange
+        m_config = Mock(calendars=[])
+        storage = DaemonEventStorage(m_config, DaemonClient(server.server_address))
+
+        # act
+        events = list(storage.get_events())
+
+        # assert
+        assert events == m_events
+
+    def test_fallback_when_daemon_is_not_running(self):
+        # arrange
+        m_calendar = Mock()
+        m_calendar.get_events.return_value = iter(m_events)
+        m_config = Mock(calendars=[m_calendar])
+        storage = DaemonEventStorage(m_config, DaemonClient("/nonexistent.sock"))
+
+        # act
+        event = storage.get_closest_event(when=arrow.get("2022-04-06T09:30"))
+
+        # assert
+        assert event == m_events[0]
+        m_calendar.get_events.assert_called_once_with(False, since=None)
@@ -0,0 +1,120 @@
+import subprocess
+import sys
+from typing import Dict
+
+import pytest
+from click.testing import CliRunner
+from mock import Mock
+
+from pycal.api import BaseCalendar
+from pycal.config import Config
+from pycal.main import cli
+
+
+def run_python(statement: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+
+def import_times(stderr: str) -> Dict[str, int]:
+    times: Dict[str, int] = {}
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        _, cumulative, module = line.split("|")
+
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+
+    return times
+
+
+@pytest.fixture(scope="module")
+def cli_imports() -> Dict[str, int]:
+    return import_times(run_python("import pycal.main").stderr)
+
+
+class TestImportTime:
+    @pytest.mark.parametrize(
+        "module",
+        [
+            "textual",
+            "rich",
+            "googleapiclient",
+            "google.auth",
+            "google_auth_oauthlib",
+            "pycal.app",
+            "pycal.views",
+            "pycal.api.providers.google_calendar",
+        ],
+    )
+    def test_cli_does_not_import_heavy_modules(self, module: str, cli_imports):
+        # assert
+        assert "pycal.main" in cli_imports
+        assert module not in cli_imports
+
+    def test_providers_are_imported_on_demand(self):
+        # act
+        result = run_python(
+            "import sys; from pycal.config import Config; "
+            "provider = 'pycal.api.providers.google_calendar'; "
+            "print(provider in sys.modules); "
+            "Config._load_factory('GoogleCalendar'); "
+            "print(provider in sys.modules, 'textual' in sys.modules)"
+        )
+
+        # assert
+        assert result.stdout.split() == ["False", "True", "False"]
+
+
+m_config = (
+    "system:\n  browser: brave\n"
+    "agenda:\n  bindings: {}\n"
+    "calendars:\n  - Test Calendar:\n      type: FakeCalendar\n"
+)
+
+
+class TestCli:
+    @pytest.fixture(autouse=True)
+    def home(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setattr(BaseCalendar, "revalidate_command", None)
+        return tmp_path
+
+    def test_invalid_calendar_type_is_reported(self, home):
+        # arrange
+        (home / ".pycal.yml").write_text(
+            m_config.replace("FakeCalendar", "OtherCalendar")
+        )
+
+        # act
+        result = CliRunner().invoke(cli, ["next"])
+
+        # assert
+        assert result.exit_code == 1
+        assert "unknown type 'OtherCalendar'" in result.output
+        assert result.exception is None or isinstance(result.exception, SystemExit)
+
+    def test_revalidate_refreshes_named_calendar(self, home, monkeypatch):
+        # arrange
+        (home / ".pycal.yml").write_text(m_config)
+        m_calendar = Mock()
+        m_calendar.name = "Test Calendar"
+        monkeypatch.setitem(
+            Config.FACTORIES, "FakeCalendar", lambda name, config: m_calendar
+        )
+
+        # act
+        result = CliRunner().invoke(cli, ["revalidate", "Test Calendar"])
+
+        # assert
+        assert result.exit_code == 0
+        m_calendar.revalidate.assert_called_once_with()
+        assert BaseCalendar.revalidate_command is not None
+        assert BaseCalendar.revalidate_command[-1] == "revalidate"
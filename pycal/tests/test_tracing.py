@@ -0,0 +1,61 @@
+import json
+import threading
+
+from pycal import tracing
+
+
+class TestTracing:
+    def teardown_method(self):
+        tracing.disable()
+
+    def test_span_is_noop_when_disabled(self):
+        # act
+        context = tracing.span("stage", calendar="Test")
+
+        # assert
+        assert context is tracing.NOOP
+
+    def test_report_aggregates_nested_spans(self):
+        # arrange
+        tracer = tracing.enable()
+
+        def fetch():
+            with tracing.span("fetch"):
+                pass
+
+        # act
+        with tracing.span("load"):
+            for _ in range(3):
+                with tracing.span("parse"):
+                    pass
+
+        thread = threading.Thread(target=fetch)
+        thread.start()
+        thread.join()
+
+        # assert
+        lines = tracer.report().splitlines()
+        assert [line.split()[:2] for line in lines] == [
+            ["load", "1x"],
+            ["parse", "3x"],
+            ["fetch", "1x"],
+        ]
+        assert lines[1].startswith("  parse")
+
+    def test_write_chrome_trace(self, tmp_path):
+        # arrange
+        tracer = tracing.enable()
+        trace_file = tmp_path / "trace.json"
+
+        with tracing.span("load", calendar="Test"):
+            with tracing.span("parse"):
+                pass
+
+        # act
+        tracer.write_chrome_trace(str(trace_file))
+
+        # assert
+        events = json.loads(trace_file.read_text())["traceEvents"]
+        assert [(e["name"], e["ph"]) for e in events] == [("load", "X"), ("parse", "X")]
+        assert events[0]["args"] == {"calendar": "Test"}
+        assert events[0]["dur"] >= events[1]["dur"]
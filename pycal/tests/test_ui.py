@@ -0,0 +1,116 @@
+from arrow.arrow import Arrow
+from mock import Mock, patch
+import pytest
+from rich.console import Console
+from textual.geometry import Offset, Region, Size
+
+from pycal.api import Event, EventStatus
+from pycal.ui import EventWidget, VirtualLayout
+
+
+def make_widget() -> EventWidget:
+    return EventWidget(
+        Event(
+            id="1",
+            title="Mock Event",
+            start_time=Arrow(2022, 4, 25, 9),
+            end_time=Arrow(2022, 4, 25, 10),
+            location="Location",
+            going=EventStatus.ACCEPTED,
+            type="Video",
+            video_link="Link",
+            calendar="Fake Calendar",
+        )
+    )
+
+
+class TestEventWidget:
+    def test_render_event(self):
+        # arrange
+        console = Console(width=40)
+        widget = make_widget()
+
+        # act
+        lines = console.render_lines(widget.render(), console.options)
+
+        # assert
+        assert len(lines) == widget.height(console, 40) == 7
+        assert "Mock Event (Fake Calendar)" in "".join(s.text for s in lines[1])
+        assert "09:00 - 10:00" in "".join(s.text for s in lines[2])
+
+    @pytest.mark.parametrize(
+        "title, width",
+        [
+            ("Mock Event", 40),
+            ("Quarterly planning with the whole product organisation", 40),
+            ("会議" * 12, 40),
+            ("Mock Event", 12),
+        ],
+    )
+    def test_height_matches_rendered_lines(self, title: str, width: int):
+        # arrange
+        console = Console(width=width)
+        widget = make_widget()
+        widget.event.title = title
+
+        # act
+        lines = console.render_lines(widget.render(), console.options)
+
+        # assert
+        assert widget.height(console, width) == len(lines)
+
+    def test_render_is_cached_per_selection(self):
+        # arrange
+        console = Console(width=40)
+        widget = make_widget()
+        deselected = widget.render()
+        console.render_lines(deselected, console.options)
+
+        with patch.object(widget, "refresh"):
+            widget.select()
+            selected = widget.render()
+            widget.deselect()
+
+        # act
+        with patch.object(console, "render_lines", wraps=console.render_lines) as m:
+            list(console.render(widget.render(), console.options))
+
+        # assert
+        assert selected is not deselected
+        assert widget.render() is deselected
+        assert m.call_count == 0
+
+    def test_event_change_invalidates_cache(self):
+        # arrange
+        console = Console(width=40)
+        widget = make_widget()
+        panel = widget.render()
+
+        # act
+        widget.event.title = "Renamed Event"
+        lines = console.render_lines(widget.render(), console.options)
+
+        # assert
+        assert widget.render() is not panel
+        assert "Renamed Event" in "".join(s.text for s in lines[1])
+
+
+class TestVirtualLayout:
+    def test_places_window_within_virtual_height(self):
+        # arrange
+        m_widget = Mock(
+            virtual_window=(650, 1402), render_cache=Mock(size=Size(60, 105))
+        )
+        m_widget.app.measure.return_value = 60
+        layout = VirtualLayout()
+        layout.add(m_widget)
+
+        # act
+        placements = list(layout.arrange(Size(60, 30), Offset(0, 0)))
+
+        # assert
+        assert [p.region for p in placements] == [
+            Region(0, 650, 60, 105),
+            Region(0, 0, 60, 1402),
+        ]
+        m_widget.render_lines_free.assert_not_called()
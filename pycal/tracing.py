@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+
+class Span:
+    __slots__ = ("name", "args", "thread", "start", "end", "children")
+
+    def __init__(self, name: str, args: Dict[str, Any]):
+        self.name = name
+        self.args = args
+        self.thread = threading.get_ident()
+        self.start = self.end = time.perf_counter()
+        self.children: List[Span] = []
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self.origin = time.perf_counter()
+        self.roots: List[Span] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[Span]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[Span]:
+        stack = self._stack()
+        span = Span(name, args)
+
+        # Spans opened on worker threads start their own tree.
+        if stack:
+            stack[-1].children.append(span)
+        else:
+            with self._lock:
+                self.roots.append(span)
+
+        stack.append(span)
+
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+            stack.pop()
+
+    def report(self) -> str:
+        tree: Dict[str, Any] = {}
+
+        def collect(spans: List[Span], nodes: Dict[str, Any]) -> None:
+            for span in spans:
+                node = nodes.setdefault(span.name, [0, 0.0, {}])
+                node[0] += 1
+                node[1] += span.duration
+                collect(span.children, node[2])
+
+        def render(nodes: Dict[str, Any], depth: int) -> Iterator[str]:
+            for name, (count, total, children) in nodes.items():
+                label = "  " * depth + name
+                yield f"{label:<40} {count:>6}x {total * 1000:10.2f} ms"
+                yield from render(children, depth + 1)
+
+        with self._lock:
+            collect(list(self.roots), tree)
+
+        return "\n".join(render(tree, 0))
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        events: List[Dict[str, Any]] = []
+        pid = os.getpid()
+
+        def collect(spans: List[Span]) -> None:
+            for span in spans:
+                events.append(
+                    {
+                        "name": span.name,
+                        "ph": "X",
+                        "ts": (span.start - self.origin) * 1e6,
+                        "dur": span.duration * 1e6,
+                        "pid": pid,
+                        "tid": span.thread,
+                        "args": span.args,
+                    }
+                )
+                collect(span.children)
+
+        with self._lock:
+            collect(list(self.roots))
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, trace_file: str) -> None:
+        with open(trace_file, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+NOOP: ContextManager[None] = nullcontext()
+
+_tracer: Optional[Tracer] = None
+
+
+def enable() -> Tracer:
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable() -> None:
+    global _tracer
+    _tracer = None
+
+
+def span(name: str, **args: Any) -> ContextManager[Any]:
+    # Disabled tracing hands out a shared no-op context manager, so hot
+    # paths only pay for a global lookup and an empty with block.
+    if _tracer is None:
+        return NOOP
+
+    return _tracer.span(name, **args)
@@ -1,14 +1,38 @@
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from rich import box
-from rich.console import RenderableType
+from rich.console import Console, ConsoleOptions, RenderableType, RenderResult
 from rich.panel import Panel
+from rich.cells import cell_len
+from rich.segment import Segment
 from rich.text import Text
+from textual.geometry import Offset, Region, Size
+from textual.layout import WidgetPlacement
+from textual.layouts.vertical import VerticalLayout
 from textual.reactive import Reactive
 from textual.widget import Widget
+from textual.widgets import ScrollView
 
 from pycal.api import Event
 
 
+class CachedPanel:
+    def __init__(self, panel: Panel):
+        self.panel = panel
+        self._lines: Dict[Tuple[int, Optional[int]], List[List[Segment]]] = {}
+
+    def __rich_console__(
+        self, console: Console, options: ConsoleOptions
+    ) -> RenderResult:
+        key = (options.max_width, options.height)
+
+        if key not in self._lines:
+            self._lines[key] = console.render_lines(self.panel, options)
+
+        for line in self._lines[key]:
+            yield from line
+            yield Segment.line()
+
+
 class EventWidget(Widget):
     selected = Reactive(False)
 
@@ -23,10 +47,31 @@ class EventWidget(Widget):
         self.next: Optional[EventWidget] = None
         self.previous: Optional[EventWidget] = None
         self.event = event
+        self._content_key: Optional[Tuple] = None
+        self._content: Optional[Text] = None
+        self._panels: Dict[bool, CachedPanel] = {}
+
+    def _event_key(self) -> Tuple:
+        event = self.event
+
+        return (
+            event.title,
+            event.calendar,
+            event.start,
+            event.end,
+            event.tz,
+            event.location,
+            event.type,
+            event.going,
+        )
 
-    def render(self) -> Panel:
-        return Panel(
-            Text.assemble(
+    def _build_content(self) -> Text:
+        # Formatting is redone only when a displayed field of the event
+        # changes, which also drops the panels rendered from it.
+        if (key := self._event_key()) != self._content_key or not self._content:
+            self._content_key = key
+            self._panels.clear()
+            self._content = Text.assemble(
                 (f"{self.event.title}", "bold yellow"),
                 (f" ({self.event.calendar})", "green"),
                 (
@@ -38,10 +83,81 @@ class EventWidget(Widget):
                     "white",
                 ),
                 (f"\n{self.event.going}", "green"),
-            ),
-            style="red on black" if self.selected else "white on black",
-            box=box.ROUNDED,
-        )
+            )
+
+        return self._content
+
+    # Cells taken by the "hh:mm - hh:mm" line of the content.
+    TIME_WIDTH = 13
+
+    def height(self, console: Console, width: int) -> int:
+        # Borders take two lines and two columns, padding another two columns.
+        width = max(width - 4, 1)
+        event = self.event
+        lines = [
+            f"{event.title} ({event.calendar})",
+            f"{event.location}",
+            f"{event.type}",
+            f"{event.going}",
+        ]
+
+        # Lines that fit take one row each, which is measured without
+        # building the content; only longer ones need Rich to wrap them. No
+        # character takes more than two cells, so short lines are not measured.
+        if self.TIME_WIDTH > width or any(
+            len(line) * 2 > width and cell_len(line) > width for line in lines
+        ):
+            return len(self._build_content().wrap(console, width)) + 2
+
+        return len(lines) + 3
+
+    def render(self) -> CachedPanel:
+        content = self._build_content()
+
+        if self.selected not in self._panels:
+            self._panels[self.selected] = CachedPanel(
+                Panel(
+                    content,
+                    style="red on black" if self.selected else "white on black",
+                    box=box.ROUNDED,
+                )
+            )
+
+        return self._panels[self.selected]
+
+
+class VirtualLayout(VerticalLayout):
+    def arrange(self, size: Size, scroll: Offset) -> Iterable[WidgetPlacement]:
+        *placements, (total, _, _) = super().arrange(size, scroll)
+        height = total.height
+
+        # Widgets with a virtual window render only the rows in view; they
+        # are moved to the offset of those rows and the scroll extent
+        # covers the full height they stand for.
+        for region, widget, order in placements:
+            if window := getattr(widget, "virtual_window", None):
+                top, virtual_height = window
+                height = max(height, region.y + virtual_height)
+                region = Region(region.x, region.y + top, region.width, region.height)
+
+            yield WidgetPlacement(region, widget, order)
+
+        yield WidgetPlacement(Region(total.x, total.y, total.width, height))
+
+
+class VirtualScrollView(ScrollView):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.window.layout = VirtualLayout()
+        self.window.layout.add(self.window.widget)
+
+    async def watch_y(self, new_value: float) -> None:
+        # The viewport is moved first, so the layout pass triggered by the
+        # scroll already sees a window that covers it.
+        if set_viewport := getattr(self.window.widget, "set_viewport", None):
+            set_viewport(round(new_value), self.size.height)
+
+        await super().watch_y(new_value)
 
 
 class FooterWidget(Widget):
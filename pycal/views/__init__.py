@@ -1,10 +1,11 @@
-from typing import Protocol, Union
+from typing import Iterable, List, Protocol, Union
 
 from rich.console import ConsoleRenderable, RichCast
 from .agenda import Agenda
 
 from textual.widgets import ScrollView
 
+from pycal.api import Event
 from pycal.ui import EventWidget
 
 
@@ -35,5 +36,14 @@ class CalendarView(Protocol):
     def reload_events(self) -> None:
         ...
 
+    def fetch_events(self, ignore_cache: bool = False) -> List[Event]:
+        ...
+
+    def show_events(self, events: Iterable[Event]) -> None:
+        ...
+
+    def set_viewport(self, y: int, height: int) -> None:
+        ...
+
     def __rich__(self) -> Union[ConsoleRenderable, RichCast, str]:
         ...
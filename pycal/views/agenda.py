@@ -1,9 +1,10 @@
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
 from datetime import date
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from rich import box
-from rich.console import RenderableType
+from rich.console import Console, ConsoleOptions, RenderableType, RenderResult
 from rich.padding import Padding
 from rich.table import Table
 from rich.text import Text
@@ -12,18 +13,46 @@ from textual.widgets import ScrollView
 from textual.reactive import Reactive
 
 from pycal.api import Event, EventStorage
+from pycal.tracing import span
 from pycal.ui import EventWidget
 
 
+class VirtualRows:
+    def __init__(self, agenda: "Agenda"):
+        self.agenda = agenda
+
+    def __rich_console__(
+        self, console: Console, options: ConsoleOptions
+    ) -> RenderResult:
+        # Rich renders the yielded table before resuming, so the span covers
+        # the layout pass and the rendering of the visible rows.
+        with span("agenda.render"):
+            yield self.agenda._render_window(console, options.max_width)
+
+
 class Agenda(Widget):
+    # Rows rendered above and below the viewport so small scrolls don't
+    # need a new layout pass.
+    OVERSCAN = 5
+    # Columns taken by the date column and the table edges.
+    EVENT_MARGIN = 8
+    # Blank lines the full table draws above and below its rows.
+    TABLE_EDGES = 2
+
     selected: Reactive[Optional[EventWidget]] = Reactive(None)
 
-    def __init__(self, storage: EventStorage):
+    def __init__(self, storage: EventStorage, virtualized: bool = False):
         super().__init__()
         self.storage = storage
+        self.virtualized = virtualized
+        self.viewport: Tuple[int, int] = (0, 0)
         self.events: Dict[date, List[EventWidget]] = defaultdict(list)
         self.head: Optional[EventWidget]
         self.tail: Optional[EventWidget]
+        self._rows: List[Tuple[bool, EventWidget]] = []
+        self._row_offsets: List[int] = []
+        self._offsets_width: Optional[int] = None
+        self._window: Tuple[int, int] = (0, 0)
         self.load_events()
 
     @property
@@ -34,6 +63,15 @@ class Agenda(Widget):
     def cols(self):
         return 1
 
+    @property
+    def virtual_window(self) -> Optional[Tuple[int, int]]:
+        # Offset of the rendered rows and the height of the whole agenda, so
+        # the scroll view can place the window without rendering the rest.
+        if not self.virtualized or not self._row_offsets:
+            return None
+
+        return self._window[0], self._row_offsets[-1] + self.TABLE_EDGES
+
     def watch_selected(
         self, previous: Optional[EventWidget], current: Optional[EventWidget]
     ) -> None:
@@ -47,13 +85,24 @@ class Agenda(Widget):
         self.load_events(ignore_cache=True)
 
     def load_events(self, ignore_cache: bool = False) -> None:
+        with span("agenda.load_events"):
+            self.show_events(self.storage.list_events(ignore_cache))
+
+    def fetch_events(self, ignore_cache: bool = False) -> List[Event]:
+        with span("agenda.fetch_events"):
+            return self.storage.list_events(ignore_cache)
+
+    def show_events(self, events: Iterable[Event]) -> None:
         self.events.clear()
+        self._rows.clear()
+        self._row_offsets.clear()
         self.head = None
         self.tail = None
         self.selected = None
 
-        for event in self.storage.get_events(ignore_cache):
-            self.add_event(event)
+        with span("agenda.show_events"):
+            for event in events:
+                self.add_event(event)
 
         self.refresh()
 
@@ -88,7 +137,9 @@ class Agenda(Widget):
 
     def add_event(self, event: Event) -> None:
         event_widget = EventWidget(event)
-        self.events[event.start_time.date()].append(event_widget)
+        day_events = self.events[event.start_time.date()]
+        self._rows.append((not day_events, event_widget))
+        day_events.append(event_widget)
 
         if not self.head:
             self.head = event_widget
@@ -136,13 +187,62 @@ class Agenda(Widget):
 
         return table
 
-    def render(self) -> RenderableType:
+    def set_viewport(self, y: int, height: int) -> None:
+        self.viewport = (y, height)
+        top, bottom = self._window
+
+        if self.virtualized and (y < top or y + height > bottom):
+            self.refresh(layout=True)
+
+    def _layout_rows(self, console: Console, width: int) -> List[int]:
+        if (
+            width != self._offsets_width
+            or len(self._row_offsets) != len(self._rows) + 1
+        ):
+            offsets = [0]
+
+            for _, event_widget in self._rows:
+                offsets.append(
+                    offsets[-1]
+                    + event_widget.height(console, width - self.EVENT_MARGIN)
+                )
+
+            self._row_offsets = offsets
+            self._offsets_width = width
+
+        return self._row_offsets
+
+    def _render_window(self, console: Console, width: int) -> Table:
+        with span("agenda.layout"):
+            offsets = self._layout_rows(console, width)
+
+        y, height = self.viewport
+        height = height or console.height
+
+        first = max(bisect_right(offsets, y) - 1 - self.OVERSCAN, 0)
+        last = min(bisect_left(offsets, y + height) + self.OVERSCAN, len(self._rows))
+        self._window = (offsets[first], offsets[last])
+
+        # Only the rows in the window are rendered and the scroll view places
+        # them using `virtual_window`. The window's own blank edges land on
+        # overscan rows, so they are never in view.
         table = self._build_table()
 
-        for events in self.events.values():
-            for index, event in enumerate(events):
+        for display_date, event_widget in self._rows[first:last]:
+            table.add_row(*self._build_event(display_date, event_widget))
+
+        return table
+
+    def render(self) -> RenderableType:
+        if self.virtualized:
+            return VirtualRows(self)
+
+        with span("agenda.render"):
+            table = self._build_table()
+
+            for display_date, event_widget in self._rows:
                 table.add_row(
-                    *self._build_event(index == 0, event),
+                    *self._build_event(display_date, event_widget),
                 )
 
         return table
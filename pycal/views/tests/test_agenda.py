@@ -1,5 +1,6 @@
 from freezegun import freeze_time
-from mock import Mock
+from mock import Mock, patch
+from rich.console import Console
 from arrow.arrow import Arrow
 import pytest
 from pycal.api import Event, EventStatus
@@ -29,7 +30,7 @@ class TestAgenda:
     def test_add_events(self, event_factory):
         m_events = [event_factory(f"fake event {i}") for i in range(3)]
         m_storage = Mock()
-        m_storage.get_events.return_value = m_events
+        m_storage.list_events.return_value = m_events
 
         # act
         agenda = Agenda(m_storage)
@@ -53,7 +54,7 @@ class TestAgenda:
     ):
         m_events = [event_factory(f"fake event {i}") for i in range(3)]
         m_storage = Mock()
-        m_storage.get_events.return_value = m_events
+        m_storage.list_events.return_value = m_events
         m_scrollview = Mock(max_scroll_y=100, y=0)
 
         # act
@@ -70,7 +71,7 @@ class TestAgenda:
         # arrange
         m_events = [event_factory("fake event")]
         m_storage = Mock()
-        m_storage.get_events.return_value = m_events
+        m_storage.list_events.return_value = m_events
 
         # act
         agenda = Agenda(m_storage)
@@ -83,3 +84,65 @@ class TestAgenda:
         cell_date = next(table.columns[0].cells)
         assert cell_date.renderable.plain == "25\nMon"
         assert isinstance(next(table.columns[1].cells), EventWidget)
+
+    def test_render_virtualized_agenda(self, event_factory):
+        # arrange
+        m_events = [event_factory(f"fake event {i}") for i in range(200)]
+        m_storage = Mock()
+        m_storage.list_events.return_value = m_events
+        console = Console(width=60, height=30)
+
+        full = Agenda(m_storage)
+        agenda = Agenda(m_storage, virtualized=True)
+        agenda.set_viewport(700, 30)
+
+        # act
+        lines = console.render_lines(agenda.render(), console.options)
+
+        # assert
+        full_lines = console.render_lines(full.render(), console.options)
+        top, height = agenda.virtual_window
+        bottom = top + len(lines) - 1
+        assert height == len(full_lines)
+        assert top <= 700 and 730 <= bottom
+        assert [[s.text for s in line] for line in lines[1:-1]] == [
+            [s.text for s in line] for line in full_lines[top:bottom][1:]
+        ]
+
+    @pytest.mark.parametrize("count", [100, 2000])
+    def test_render_virtualized_agenda_is_bounded_by_viewport(
+        self, event_factory, count: int
+    ):
+        # arrange
+        m_storage = Mock()
+        m_storage.list_events.return_value = [
+            event_factory(f"fake event {i}") for i in range(count)
+        ]
+        console = Console(width=60, height=30)
+        agenda = Agenda(m_storage, virtualized=True)
+        agenda.set_viewport(350, 30)
+
+        # act
+        lines = console.render_lines(agenda.render(), console.options)
+
+        # assert
+        row_height = 7
+        window_rows = 30 // row_height + 2 * Agenda.OVERSCAN + 2
+        assert len(lines) <= 30 + (2 * Agenda.OVERSCAN + 2) * row_height + 2
+        assert sum(w._content is not None for _, w in agenda._rows) <= window_rows
+
+    def test_set_viewport_outside_window_refreshes(self, event_factory):
+        # arrange
+        m_storage = Mock()
+        m_storage.list_events.return_value = [event_factory(f"{i}") for i in range(50)]
+        agenda = Agenda(m_storage, virtualized=True)
+        agenda._render_window(Console(width=60, height=30), 60)
+
+        with patch.object(agenda, "refresh") as m_refresh:
+            # act
+            agenda.set_viewport(7, 20)
+            m_refresh.assert_not_called()
+            agenda.set_viewport(300, 20)
+
+        # assert
+        m_refresh.assert_called_once_with(layout=True)